@@ -0,0 +1,85 @@
+import argparse
+import csv
+import os
+import sys
+import time
+
+from extractor import _extract_teams, extract_teams
+
+# ── extract_teams micro-benchmark ─────────────────────────────────────────────
+# Runs the extractor over data/market_titles.csv (real Polymarket EPL / NBA
+# titles with hand-labelled teams) and reports throughput and accuracy.
+#
+#   python bench_extractor.py                     # report
+#   python bench_extractor.py --min-accuracy 0.8  # exit 1 below 80%
+#   python bench_extractor.py -v                  # list mismatches
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "market_titles.csv")
+
+
+def load_corpus(path=CORPUS):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            (row["league"], row["question"], [t for t in row["expected"].split(";") if t])
+            for row in csv.DictReader(f)
+        ]
+
+
+def _titles_per_second(fn, questions, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(questions)
+    return len(questions) * repeat / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark extract_teams on the title corpus.")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--min-accuracy", type=float, default=None)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    corpus    = load_corpus()
+    questions = [(league, q) for league, q, _ in corpus]
+
+    def warm(qs):
+        for league, q in qs:
+            extract_teams(q, league)
+
+    def cold(qs):
+        _extract_teams.cache_clear()
+        warm(qs)
+
+    cold_tps = _titles_per_second(cold, questions, args.repeat)
+    warm_tps = _titles_per_second(warm, questions, args.repeat)
+
+    by_league = {}
+    misses = []
+    for league, question, expected in corpus:
+        got = extract_teams(question, league)
+        hit, total = by_league.get(league, (0, 0))
+        by_league[league] = (hit + (got == expected), total + 1)
+        if got != expected:
+            misses.append((league, question, expected, got))
+
+    hits = sum(h for h, _ in by_league.values())
+    accuracy = hits / len(corpus)
+
+    print(f"titles:     {len(corpus)}")
+    print(f"cold:       {cold_tps:,.0f} titles/s")
+    print(f"memoized:   {warm_tps:,.0f} titles/s")
+    for league, (h, t) in sorted(by_league.items()):
+        print(f"accuracy:   {league:<5} {h}/{t} ({h / t:.0%})")
+    print(f"accuracy:   all   {hits}/{len(corpus)} ({accuracy:.0%})")
+
+    if args.verbose:
+        for league, question, expected, got in misses:
+            print(f"  [{league}] {question!r}: expected {expected}, got {got}")
+
+    if args.min_accuracy is not None and accuracy < args.min_accuracy:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,53 @@
 import whalescore
+from concurrent.futures import ThreadPoolExecutor
+
+_UNSET = object()
+
+MAX_WORKERS = 8  # speculation ratios computed at once by materialize_analytics
+
 
 class Bet:
-    def __init__(self, id, question, volume, startDate, compute_speculation=True):
+    """
+    One market. Whale and speculation ratios hit the network, so they are
+    computed on first access and memoized; building a Bet is free.
+    """
+
+    __slots__ = ("id", "question", "volume", "startDate", "league",
+                 "_whale_ratio", "_speculation_ratio")
+
+    def __init__(self, id, question, volume, startDate, league="prem"):
         self.id = id
         self.question = question
         self.volume = volume
         self.startDate = startDate
+        self.league = league
+
+        # analytics fields, filled lazily
+        self._speculation_ratio = _UNSET
+        self._whale_ratio = _UNSET
+
+    def __repr__(self):
+        return f"Bet({self.id!r}, {self.question!r})"
 
-                # analytics fields
-        self.speculation_ratio = None
-        self.whale_ratio = None
+    @property
+    def whale_ratio(self):
+        if self._whale_ratio is _UNSET:
+            self.getWhale()
+        return self._whale_ratio
 
-        self.getWhale()
+    @whale_ratio.setter
+    def whale_ratio(self, value):
+        self._whale_ratio = value
 
-        if compute_speculation:
+    @property
+    def speculation_ratio(self):
+        if self._speculation_ratio is _UNSET:
             self.compute_speculation_ratio()
+        return self._speculation_ratio
+
+    @speculation_ratio.setter
+    def speculation_ratio(self, value):
+        self._speculation_ratio = value
 
     def compute_speculation_ratio(self):
         """
@@ -22,9 +55,30 @@ class Bet:
         """
         try:
             from speculation import find_single_speculation_ratio
-            self.speculation_ratio = find_single_speculation_ratio(self)
+            self._speculation_ratio = find_single_speculation_ratio(self)
         except Exception:
-            self.speculation_ratio = None
+            self._speculation_ratio = None
+        return self._speculation_ratio
 
     def getWhale(self):
-        self.whale_ratio = whalescore.single_whale_ratio(self.id)
\ No newline at end of file
+        self._whale_ratio = whalescore.single_whale_ratio(self.id)
+        return self._whale_ratio
+
+
+def materialize_analytics(bets, speculation=True, max_workers=MAX_WORKERS):
+    """
+    Fill whale (and optionally speculation) ratios for many bets concurrently.
+
+    Already-computed ratios are left alone. Returns `bets` for chaining.
+    """
+    need_whale = [b for b in bets if b._whale_ratio is _UNSET]
+    need_spec  = [b for b in bets if speculation and b._speculation_ratio is _UNSET]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        whale_future = pool.submit(whalescore.batch_whale_ratios, [b.id for b in need_whale])
+        list(pool.map(Bet.compute_speculation_ratio, need_spec))
+        ratios = whale_future.result()
+
+    for b in need_whale:
+        b._whale_ratio = ratios.get(b.id)   # None when the trades fetch failed
+    return bets
@@ -0,0 +1,114 @@
+import threading
+import time
+import numpy as np
+from cachetools import TTLCache, cached
+from numpy.lib.stride_tricks import sliding_window_view
+
+import pricestore
+
+# ── Co-moving markets ─────────────────────────────────────────────────────────
+# Aligns the price series pricestore holds for many markets onto one time grid
+# (markets x steps, last price carried forward) and computes price changes and
+# rolling pairwise correlations on the whole matrix at once. Markets whose
+# latest-window correlation clears CLUSTER_CORR are grouped, so the list page
+# can flag exposure concentrated on one fixture or one title race.
+
+GRID_STEP    = 600    # seconds between grid points
+ROLL_WINDOW  = 36     # grid steps per correlation window (6 hours)
+CLUSTER_CORR = 0.8
+MATRIX_TTL   = 60
+
+_matrix_cache = TTLCache(maxsize=16, ttl=MATRIX_TTL)
+_matrix_lock  = threading.Lock()
+
+
+def align(series, grid):
+    """
+    (len(series), len(grid)) matrix of each (timestamps, prices) pair sampled
+    at `grid` with the last known price; NaN before a series' first point.
+    """
+    matrix = np.full((len(series), len(grid)), np.nan)
+    for row, (t, p) in enumerate(series):
+        if not len(t):
+            continue
+        idx = np.searchsorted(t, grid, side="right") - 1
+        matrix[row] = np.where(idx >= 0, p[np.maximum(idx, 0)], np.nan)
+    return matrix
+
+
+def price_changes(matrix):
+    """Per-step price changes. Probabilities are bounded, so plain differences, not log returns."""
+    return np.diff(matrix, axis=1)
+
+
+def rolling_correlation(changes, window=ROLL_WINDOW):
+    """
+    (steps - window + 1, markets, markets) correlation of `changes` over each
+    trailing window. Steps before a market's first price count as no change;
+    a series flat over the whole window correlates 0 with everything.
+    """
+    changes = np.nan_to_num(changes)
+    n, steps = changes.shape
+    if steps < window:
+        return np.zeros((0, n, n))
+    windows = sliding_window_view(changes, window, axis=1).transpose(1, 0, 2)   # (k, n, w)
+    centred = windows - windows.mean(axis=2, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = centred / np.sqrt((centred ** 2).sum(axis=2, keepdims=True))
+    z = np.nan_to_num(z)
+    return np.einsum("knw,kmw->knm", z, z)
+
+
+def clusters(corr, threshold=CLUSTER_CORR):
+    """
+    Connected groups (indices, size >= 2) of markets linked by a correlation
+    of at least `threshold`. Signed: markets moving in opposite directions
+    hedge each other and are not grouped.
+    """
+    linked = corr >= threshold
+    np.fill_diagonal(linked, False)
+    seen, groups = set(), []
+    for start in range(len(corr)):
+        if start in seen or not linked[start].any():
+            continue
+        group, stack = [], [start]
+        seen.add(start)
+        while stack:
+            i = stack.pop()
+            group.append(i)
+            for j in np.flatnonzero(linked[i]):
+                if j not in seen:
+                    seen.add(j)
+                    stack.append(int(j))
+        groups.append(sorted(group))
+    return groups
+
+
+@cached(_matrix_cache, key=lambda market_ids: tuple(market_ids), lock=_matrix_lock)
+def _analyse(market_ids):
+    series = [pricestore.series(m, max_points=None) for m in market_ids]
+    end  = int(time.time()) // GRID_STEP * GRID_STEP
+    grid = np.arange(end - pricestore.WINDOW, end + 1, GRID_STEP)
+    matrix  = align(series, grid)
+    changes = price_changes(matrix)
+    rolling = rolling_correlation(changes)
+    latest  = rolling[-1] if len(rolling) else np.zeros((len(market_ids), len(market_ids)))
+    return {
+        "ids":     list(market_ids),
+        "grid":    grid,
+        "prices":  matrix,
+        "changes": changes,
+        "rolling": rolling,
+        "corr":    latest,
+    }
+
+
+def analyse(market_ids):
+    """Price matrix, changes and correlations for `market_ids`; cached for MATRIX_TTL seconds."""
+    return _analyse(tuple(str(m) for m in market_ids))
+
+
+def correlated_groups(market_ids, threshold=CLUSTER_CORR):
+    """Lists of market ids whose prices moved together over the latest window."""
+    result = analyse(market_ids)
+    return [[result["ids"][i] for i in group] for group in clusters(result["corr"], threshold)]
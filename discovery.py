@@ -0,0 +1,153 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+import http_client
+from leagues import LEAGUES
+
+BASE = "https://gamma-api.polymarket.com"
+
+# ── Streaming market discovery ────────────────────────────────────────────────
+# Walks gamma /markets for each league in offset pages, PAGE_WORKERS pages in
+# flight at a time, with status and ordering filtered server-side. Pages are
+# consumed as they arrive and only the columns the app needs are kept, so the
+# whole long tail of active markets (not just the top 50) fits in a small
+# MarketTable. Memory is bounded by MAX_MARKETS per league.
+
+PAGE_SIZE    = 100
+PAGE_WORKERS = 4
+MAX_MARKETS  = 2000   # per league
+
+MARKET_FILTERS = {
+    "active": "true",
+    "closed": "false",
+    "archived": "false",
+    "order": "volumeNum",
+    "ascending": "false",
+}
+
+TEXT_COLUMNS    = ("id", "conditionId", "question", "startDate", "endDate", "league")
+NUMERIC_COLUMNS = ("volume", "volume24hr", "liquidity", "bestBid", "bestAsk")
+
+
+def fetch_page(league, offset, limit=PAGE_SIZE, **filters):
+    """One page of /markets for a league, highest volume first."""
+    params = {**MARKET_FILTERS, **filters,
+              "tag_id": LEAGUES[league]["tag_id"], "limit": limit, "offset": offset}
+    return http_client.get_json(f"{BASE}/markets", params=params)
+
+
+def iter_pages(league, max_markets=MAX_MARKETS, workers=PAGE_WORKERS, **filters):
+    """
+    Yield /markets pages for `league` in offset order. Each wave requests
+    `workers` consecutive offsets concurrently; the walk ends at the first
+    short page or at `max_markets`.
+    """
+    offsets = range(0, max_markets, PAGE_SIZE)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for wave in range(0, len(offsets), workers):
+            batch = offsets[wave:wave + workers]
+            pages = pool.map(lambda o: fetch_page(league, o, min(PAGE_SIZE, max_markets - o), **filters), batch)
+            for offset, page in zip(batch, pages):
+                yield page
+                if len(page) < min(PAGE_SIZE, max_markets - offset):
+                    return
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _start_date(market):
+    """The event's start (kick-off / tip-off) if gamma embeds it, else the market's own."""
+    events = market.get("events") or [{}]
+    return events[0].get("startDate") or market.get("startDate") or ""
+
+
+class MarketTable:
+    """Columnar table of discovered markets: text columns as lists, numbers as float arrays."""
+
+    def __init__(self, text=None, numeric=None):
+        self.text    = text    or {c: [] for c in TEXT_COLUMNS}
+        self.numeric = numeric or {c: np.empty(0) for c in NUMERIC_COLUMNS}
+
+    def __len__(self):
+        return len(self.text["id"])
+
+    @classmethod
+    def from_pages(cls, pages, league):
+        """Build a table from a stream of /markets pages, keeping the first copy of each id."""
+        text    = {c: [] for c in TEXT_COLUMNS}
+        numeric = {c: [] for c in NUMERIC_COLUMNS}
+        seen    = set()
+        for page in pages:
+            for m in page:
+                mid = m.get("id")
+                if mid is None or str(mid) in seen:
+                    continue
+                seen.add(str(mid))
+                text["id"].append(str(mid))
+                text["conditionId"].append(m.get("conditionId") or "")
+                text["question"].append(m.get("question", ""))
+                text["startDate"].append(_start_date(m))
+                text["endDate"].append(m.get("endDate"))
+                text["league"].append(league)
+                for c in NUMERIC_COLUMNS:
+                    numeric[c].append(_number(m.get(c)))
+        return cls(text, {c: np.asarray(v, dtype=np.float64) for c, v in numeric.items()})
+
+    @classmethod
+    def concat(cls, tables):
+        tables = list(tables)
+        return cls({c: [v for t in tables for v in t.text[c]] for c in TEXT_COLUMNS},
+                   {c: np.concatenate([t.numeric[c] for t in tables] or [np.empty(0)]) for c in NUMERIC_COLUMNS})
+
+    def record(self, i):
+        """Row `i` as the app's market dict."""
+        row = {c: self.text[c][i] for c in TEXT_COLUMNS}
+        for c in NUMERIC_COLUMNS:
+            v = self.numeric[c][i]
+            if c in ("volume", "volume24hr", "liquidity"):
+                row[c] = 0.0 if np.isnan(v) else float(v)
+            else:
+                row[c] = None if np.isnan(v) else float(v)
+        return row
+
+    def records(self, indices=None):
+        return [self.record(i) for i in (range(len(self)) if indices is None else indices)]
+
+    def rows(self, league=None):
+        """Row indices, optionally for one league."""
+        if league is None:
+            return np.arange(len(self))
+        return np.flatnonzero(np.asarray(self.text["league"], dtype=object) == league)
+
+    def top(self, n, by="volume", league=None):
+        """The `n` highest rows by a numeric column as market dicts."""
+        rows   = self.rows(league)
+        values = np.nan_to_num(self.numeric[by][rows], nan=-np.inf)
+        order  = rows[np.argsort(-values, kind="stable")[:n]]
+        return self.records(order)
+
+
+def discover_markets(leagues=None, max_markets=MAX_MARKETS, on_page=None, **filters):
+    """
+    MarketTable of every active market for `leagues` (default: all registered),
+    leagues walked concurrently. `on_page(page)` sees each raw page as it
+    streams past, e.g. to keep full market dicts for a detail cache.
+    """
+    keys = list(leagues or LEAGUES)
+
+    def _pages(league):
+        for page in iter_pages(league, max_markets, **filters):
+            if on_page is not None:
+                on_page(page)
+            yield page
+
+    def _league(league):
+        return MarketTable.from_pages(_pages(league), league)
+
+    with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+        return MarketTable.concat(pool.map(_league, keys))
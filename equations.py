@@ -1,12 +1,25 @@
 import math
-from top50Markets import FindTop50Markets
 
 
 k = 0.1
 
 def calc_whale_metric(average_ratio, this_ratio):
+    """Logistic of k * (this - average), written so exp() never overflows."""
     difference = this_ratio - average_ratio
-    score = 1 / (1 + math.exp(-k * difference))
-    return score
+    if difference >= 0:
+        return 1 / (1 + math.exp(-k * difference))
+    z = math.exp(k * difference)
+    return z / (1 + z)
 
-print(calc_whale_metric(25, 30))
\ No newline at end of file
+
+def risk_score(whale_ratio, speculation_ratio, avg_whale, avg_spec):
+    """
+    Composite of both metrics normalised against their league averages:
+      1 - (calc_whale_metric(avg_whale, whale) + calc_whale_metric(avg_spec, spec)) / 2
+    None when any input is missing.
+    """
+    if None in (whale_ratio, speculation_ratio, avg_whale, avg_spec):
+        return None
+    whale_component = calc_whale_metric(avg_whale, float(whale_ratio))
+    spec_component  = calc_whale_metric(avg_spec,  float(speculation_ratio))
+    return 1 - (whale_component + spec_component) / 2
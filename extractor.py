@@ -1,74 +1,46 @@
+import json
+import os
 import re
+from functools import lru_cache
+from matcher import AliasMatcher
+
+# ── Canonical team name maps ──────────────────────────────────────────────────
+# One JSON file per league in data/aliases/, named after the league key in
+# leagues.LEAGUES. Each maps any common variant → the short name Reddit actually
+# uses in post titles, and is compiled into an AliasMatcher once at import.
+ALIAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "aliases")
+
+# data/trends_terms/ maps canonical → the keyword to search Google Trends for,
+# for leagues whose canonical names are too ambiguous on their own ("Heat",
+# "Magic", "Jazz"). Teams without an entry are searched by canonical name.
+TRENDS_TERM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "trends_terms")
+
+DEFAULT_LEAGUE = "prem"
+
+
+def load_alias_tables(path=ALIAS_DIR):
+    """{league: {variant: canonical}} from every *.json file in `path`."""
+    tables = {}
+    for filename in sorted(os.listdir(path)):
+        if filename.endswith(".json"):
+            with open(os.path.join(path, filename), encoding="utf-8") as f:
+                tables[filename[:-len(".json")]] = json.load(f)
+    return tables
+
+
+ALIAS_TABLES = load_alias_tables()
+TRENDS_TERMS = load_alias_tables(TRENDS_TERM_DIR)
+MATCHERS     = {league: AliasMatcher(table) for league, table in ALIAS_TABLES.items()}
+
+TEAM_ALIASES  = ALIAS_TABLES[DEFAULT_LEAGUE]
+ALIAS_MATCHER = MATCHERS[DEFAULT_LEAGUE]
+
+_NO_ALIASES = AliasMatcher({})
+
+
+def _matcher(league):
+    return MATCHERS.get(league or DEFAULT_LEAGUE, _NO_ALIASES)
 
-# ── Canonical team name map ───────────────────────────────────────────────────
-# Maps any common variant → the short name Reddit actually uses in post titles
-TEAM_ALIASES = {
-    # Arsenal
-    "Arsenal":                          "Arsenal",
-    # Aston Villa
-    "Aston Villa":                      "Aston Villa",
-    # Bournemouth
-    "AFC Bournemouth":                  "Bournemouth",
-    "Bournemouth":                      "Bournemouth",
-    # Brentford
-    "Brentford":                        "Brentford",
-    # Brighton
-    "Brighton & Hove Albion":           "Brighton",
-    "Brighton and Hove Albion":         "Brighton",
-    "Brighton":                         "Brighton",
-    # Burnley
-    "Burnley":                          "Burnley",
-    # Chelsea
-    "Chelsea":                          "Chelsea",
-    # Crystal Palace
-    "Crystal Palace":                   "Crystal Palace",
-    # Everton
-    "Everton":                          "Everton",
-    # Fulham
-    "Fulham":                           "Fulham",
-    # Leeds
-    "Leeds United":                     "Leeds United",
-    "Leeds":                            "Leeds United",
-    # Leicester
-    "Leicester City":                   "Leicester",
-    "Leicester":                        "Leicester",
-    # Liverpool
-    "Liverpool":                        "Liverpool",
-    # Luton
-    "Luton Town":                       "Luton",
-    "Luton":                            "Luton",
-    # Man City  ← CRITICAL: keep distinct from Man United
-    "Manchester City":                  "Manchester City",
-    "Man City":                         "Manchester City",
-    # Man United ← CRITICAL: keep distinct from Man City
-    "Manchester United":                "Manchester United",
-    "Man United":                       "Manchester United",
-    "Man Utd":                          "Manchester United",
-    # Newcastle
-    "Newcastle United":                 "Newcastle",
-    "Newcastle":                        "Newcastle",
-    # Nottingham Forest
-    "Nottingham Forest":                "Nottingham Forest",
-    "Nottm Forest":                     "Nottingham Forest",
-    # Sheffield United
-    "Sheffield United":                 "Sheffield United",
-    "Sheffield":                        "Sheffield United",
-    # Southampton
-    "Southampton":                      "Southampton",
-    # Sunderland
-    "Sunderland":                       "Sunderland",
-    # Tottenham
-    "Tottenham Hotspur":                "Tottenham",
-    "Tottenham":                        "Tottenham",
-    "Spurs":                            "Tottenham",
-    # West Ham
-    "West Ham United":                  "West Ham",
-    "West Ham":                         "West Ham",
-    # Wolves
-    "Wolverhampton Wanderers":          "Wolves",
-    "Wolverhampton":                    "Wolves",
-    "Wolves":                           "Wolves",
-}
 
 # Suffixes to strip from team names
 _SUFFIXES = re.compile(
@@ -90,6 +62,14 @@ _MARKET_SUFFIXES = re.compile(
 )
 
 
+# Question shapes tried by extract_teams, in order
+_VS_PATTERN     = re.compile(r'^(.+?)\s+vs\.?\s+(.+?)$', re.IGNORECASE)
+_WILL_PATTERN   = re.compile(r'Will\s+(.+?)\s+(?:win|beat|score)', re.IGNORECASE)
+_TO_WIN_PATTERN = re.compile(r'(.+?)\s+to\s+win', re.IGNORECASE)
+
+EXTRACT_CACHE_SIZE = 4096
+
+
 def _strip_suffixes(name: str) -> str:
     """Remove FC/AFC and common suffixes from a team name."""
     name = name.strip()
@@ -101,60 +81,76 @@ def _strip_suffixes(name: str) -> str:
     return name.rstrip("?.,;:-")
 
 
-def _resolve_alias(name: str) -> str:
-    """Look up canonical Reddit-friendly team name."""
+def _resolve_alias(name: str, league: str = DEFAULT_LEAGUE) -> str:
+    """Look up canonical Reddit-friendly team name in the league's alias table."""
+    matcher = _matcher(league)
     # Try exact match first
-    if name in TEAM_ALIASES:
-        return TEAM_ALIASES[name]
+    if name in matcher:
+        return matcher.get(name)
     # Try after stripping suffixes
     stripped = _strip_suffixes(name)
-    if stripped in TEAM_ALIASES:
-        return TEAM_ALIASES[stripped]
-    # Fuzzy: check if any alias key is contained within the name
-    for key, canonical in TEAM_ALIASES.items():
-        if key.lower() in name.lower():
-            return canonical
+    if stripped in matcher:
+        return matcher.get(stripped)
+    # Fuzzy: longest alias key contained within the name
+    canonical = matcher.longest(name)
+    if canonical:
+        return canonical
     # Fallback: return stripped name
     return stripped
 
 
-def extract_teams(question: str) -> list[str]:
+def extract_teams(question: str, league: str = DEFAULT_LEAGUE) -> list[str]:
     """
     Extract clean, Reddit-searchable team name keywords from a bet question.
 
+    Team names are resolved against `league`'s alias table. Results are
+    memoized per (question, league), since the same titles recur on every
+    refresh.
+
     Examples:
       "Arsenal FC vs. Chelsea FC - More Markets"    → ["Arsenal", "Chelsea"]
       "Manchester City FC vs. Nottingham Forest FC" → ["Manchester City", "Nottingham Forest"]
       "Will Liverpool win the Premier League?"      → ["Liverpool"]
       "Premier League Winner"                       → ["Premier League"]
     """
+    return list(_extract_teams(question, league))
+
+
+def extract_teams_many(questions, league: str = DEFAULT_LEAGUE) -> list[list[str]]:
+    """extract_teams for a batch of questions; repeated titles are resolved once."""
+    return [list(_extract_teams(q, league)) for q in questions]
+
+
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
+def _extract_teams(question: str, league: str) -> tuple:
     # 1. Strip market type suffix
     clean_q = _MARKET_SUFFIXES.sub("", question).strip()
 
     # 2. Try "X vs. Y" or "X vs Y" pattern
-    vs_match = re.search(
-        r'^(.+?)\s+vs\.?\s+(.+?)$',
-        clean_q,
-        re.IGNORECASE
-    )
+    vs_match = _VS_PATTERN.search(clean_q)
     if vs_match:
-        team_a = _resolve_alias(vs_match.group(1).strip())
-        team_b = _resolve_alias(vs_match.group(2).strip())
-        return [team_a, team_b]
+        team_a = _resolve_alias(vs_match.group(1).strip(), league)
+        team_b = _resolve_alias(vs_match.group(2).strip(), league)
+        return (team_a, team_b)
 
     # 3. "Will X win..." pattern
-    will_match = re.search(r'Will\s+(.+?)\s+(?:win|beat|score)', clean_q, re.IGNORECASE)
+    will_match = _WILL_PATTERN.search(clean_q)
     if will_match:
-        return [_resolve_alias(will_match.group(1))]
+        return (_resolve_alias(will_match.group(1), league),)
 
     # 4. "X to win" pattern
-    to_win_match = re.search(r'(.+?)\s+to\s+win', clean_q, re.IGNORECASE)
+    to_win_match = _TO_WIN_PATTERN.search(clean_q)
     if to_win_match:
-        candidate = _resolve_alias(to_win_match.group(1))
+        candidate = _resolve_alias(to_win_match.group(1), league)
         # Only return if it looks like a team name (not "Premier League Winner to win")
         if len(candidate.split()) <= 4:
-            return [candidate]
+            return (candidate,)
+
+    # 5. Any known team mentioned anywhere ("Will Chelsea finish in the top 4?")
+    known = tuple(dict.fromkeys(_matcher(league).find_all(clean_q)))
+    if known:
+        return known
 
-    # 5. Fallback: return the cleaned question as a single search term
+    # 6. Fallback: return the cleaned question as a single search term
     fallback = _strip_suffixes(clean_q)
-    return [fallback] if fallback else []
+    return (fallback,) if fallback else ()
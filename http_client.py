@@ -0,0 +1,85 @@
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+# ── Shared HTTP client ────────────────────────────────────────────────────────
+# One keep-alive session per host, a per-host concurrency cap, and jittered
+# exponential retry on 429 / 5xx / connection errors. 429 responses honour the
+# server's Retry-After header. Every fetcher in the project goes through here.
+
+DEFAULT_TIMEOUT  = 10    # seconds, per request
+MAX_ATTEMPTS     = 5
+POOL_SIZE        = 16    # keep-alive connections per host
+HOST_CONCURRENCY = 8     # max in-flight requests per host
+MAX_BACKOFF      = 30    # seconds
+
+_sessions = {}
+_slots    = {}
+_lock     = threading.Lock()
+
+
+class RetryableHTTPError(requests.HTTPError):
+    """429 / 5xx response; `retry_after` is the server hint in seconds, if any."""
+
+    def __init__(self, response):
+        super().__init__(f"{response.status_code} for {response.url}", response=response)
+        try:
+            self.retry_after = float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            self.retry_after = None
+
+
+def _host_state(url):
+    host = urlparse(url).netloc
+    with _lock:
+        if host not in _sessions:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _sessions[host] = s
+            _slots[host] = threading.BoundedSemaphore(HOST_CONCURRENCY)
+        return _sessions[host], _slots[host]
+
+
+def _is_retryable(exc):
+    return isinstance(exc, (RetryableHTTPError, requests.ConnectionError, requests.Timeout))
+
+
+_jitter = wait_random_exponential(multiplier=0.5, max=MAX_BACKOFF)
+
+
+def _wait(retry_state):
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, RetryableHTTPError) and exc.retry_after is not None:
+        return min(exc.retry_after, MAX_BACKOFF)
+    return _jitter(retry_state)
+
+
+@retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=_wait,
+    stop=stop_after_attempt(MAX_ATTEMPTS),
+    reraise=True,
+)
+def get(url, params=None, timeout=DEFAULT_TIMEOUT):
+    """GET through the pooled session for `url`'s host. Raises on HTTP errors."""
+    session, slot = _host_state(url)
+    with slot:
+        r = session.get(url, params=params, timeout=timeout)
+    if r.status_code == 429 or r.status_code >= 500:
+        raise RetryableHTTPError(r)
+    r.raise_for_status()
+    return r
+
+
+def get_json(url, params=None, timeout=DEFAULT_TIMEOUT):
+    return get(url, params=params, timeout=timeout).json()
@@ -0,0 +1,112 @@
+from extractor import ALIAS_TABLES, TRENDS_TERMS
+from matcher import AliasMatcher
+
+# ── Club badge map (ESPN CDN, no API key needed) ───────────────────────────────
+CLUB_BADGES = {
+    "Arsenal":              "https://a.espncdn.com/i/teamlogos/soccer/500/359.png",
+    "Aston Villa":          "https://a.espncdn.com/i/teamlogos/soccer/500/362.png",
+    "Bournemouth":          "https://a.espncdn.com/i/teamlogos/soccer/500/349.png",
+    "Brentford":            "https://a.espncdn.com/i/teamlogos/soccer/500/337.png",
+    "Brighton":             "https://a.espncdn.com/i/teamlogos/soccer/500/331.png",
+    "Chelsea":              "https://a.espncdn.com/i/teamlogos/soccer/500/363.png",
+    "Crystal Palace":       "https://a.espncdn.com/i/teamlogos/soccer/500/384.png",
+    "Everton":              "https://a.espncdn.com/i/teamlogos/soccer/500/368.png",
+    "Fulham":               "https://a.espncdn.com/i/teamlogos/soccer/500/370.png",
+    "Ipswich Town":         "https://a.espncdn.com/i/teamlogos/soccer/500/QuoteIPSWICH.png",
+    "Ipswich":              "https://a.espncdn.com/i/teamlogos/soccer/500/QuoteIPSWICH.png",
+    "Leicester City":       "https://a.espncdn.com/i/teamlogos/soccer/500/375.png",
+    "Leicester":            "https://a.espncdn.com/i/teamlogos/soccer/500/375.png",
+    "Liverpool":            "https://a.espncdn.com/i/teamlogos/soccer/500/364.png",
+    "Manchester City":      "https://a.espncdn.com/i/teamlogos/soccer/500/382.png",
+    "Man City":             "https://a.espncdn.com/i/teamlogos/soccer/500/382.png",
+    "Manchester United":    "https://a.espncdn.com/i/teamlogos/soccer/500/360.png",
+    "Man United":           "https://a.espncdn.com/i/teamlogos/soccer/500/360.png",
+    "Newcastle United":     "https://a.espncdn.com/i/teamlogos/soccer/500/361.png",
+    "Newcastle":            "https://a.espncdn.com/i/teamlogos/soccer/500/361.png",
+    "Nottingham Forest":    "https://a.espncdn.com/i/teamlogos/soccer/500/393.png",
+    "Southampton":          "https://a.espncdn.com/i/teamlogos/soccer/500/376.png",
+    "Tottenham Hotspur":    "https://a.espncdn.com/i/teamlogos/soccer/500/367.png",
+    "Tottenham":            "https://a.espncdn.com/i/teamlogos/soccer/500/367.png",
+    "Spurs":                "https://a.espncdn.com/i/teamlogos/soccer/500/367.png",
+    "West Ham United":      "https://a.espncdn.com/i/teamlogos/soccer/500/371.png",
+    "West Ham":             "https://a.espncdn.com/i/teamlogos/soccer/500/371.png",
+    "Wolverhampton":        "https://a.espncdn.com/i/teamlogos/soccer/500/380.png",
+    "Wolves":               "https://a.espncdn.com/i/teamlogos/soccer/500/380.png",
+}
+
+NBA_BADGES = {
+    "Atlanta Hawks":        "https://a.espncdn.com/i/teamlogos/nba/500/atl.png",
+    "Boston Celtics":       "https://a.espncdn.com/i/teamlogos/nba/500/bos.png",
+    "Brooklyn Nets":        "https://a.espncdn.com/i/teamlogos/nba/500/bkn.png",
+    "Charlotte Hornets":    "https://a.espncdn.com/i/teamlogos/nba/500/cha.png",
+    "Chicago Bulls":        "https://a.espncdn.com/i/teamlogos/nba/500/chi.png",
+    "Cleveland Cavaliers":  "https://a.espncdn.com/i/teamlogos/nba/500/cle.png",
+    "Dallas Mavericks":     "https://a.espncdn.com/i/teamlogos/nba/500/dal.png",
+    "Denver Nuggets":       "https://a.espncdn.com/i/teamlogos/nba/500/den.png",
+    "Detroit Pistons":      "https://a.espncdn.com/i/teamlogos/nba/500/det.png",
+    "Golden State Warriors":"https://a.espncdn.com/i/teamlogos/nba/500/gs.png",
+    "Houston Rockets":      "https://a.espncdn.com/i/teamlogos/nba/500/hou.png",
+    "Indiana Pacers":       "https://a.espncdn.com/i/teamlogos/nba/500/ind.png",
+    "LA Clippers":          "https://a.espncdn.com/i/teamlogos/nba/500/lac.png",
+    "Los Angeles Clippers": "https://a.espncdn.com/i/teamlogos/nba/500/lac.png",
+    "LA Lakers":            "https://a.espncdn.com/i/teamlogos/nba/500/lal.png",
+    "Los Angeles Lakers":   "https://a.espncdn.com/i/teamlogos/nba/500/lal.png",
+    "Memphis Grizzlies":    "https://a.espncdn.com/i/teamlogos/nba/500/mem.png",
+    "Miami Heat":           "https://a.espncdn.com/i/teamlogos/nba/500/mia.png",
+    "Milwaukee Bucks":      "https://a.espncdn.com/i/teamlogos/nba/500/mil.png",
+    "Minnesota Timberwolves":"https://a.espncdn.com/i/teamlogos/nba/500/min.png",
+    "New Orleans Pelicans": "https://a.espncdn.com/i/teamlogos/nba/500/no.png",
+    "New York Knicks":      "https://a.espncdn.com/i/teamlogos/nba/500/ny.png",
+    "Oklahoma City Thunder":"https://a.espncdn.com/i/teamlogos/nba/500/okc.png",
+    "Orlando Magic":        "https://a.espncdn.com/i/teamlogos/nba/500/orl.png",
+    "Philadelphia 76ers":   "https://a.espncdn.com/i/teamlogos/nba/500/phi.png",
+    "Phoenix Suns":         "https://a.espncdn.com/i/teamlogos/nba/500/phx.png",
+    "Portland Trail Blazers":"https://a.espncdn.com/i/teamlogos/nba/500/por.png",
+    "Sacramento Kings":     "https://a.espncdn.com/i/teamlogos/nba/500/sac.png",
+    "San Antonio Spurs":    "https://a.espncdn.com/i/teamlogos/nba/500/sa.png",
+    "Toronto Raptors":      "https://a.espncdn.com/i/teamlogos/nba/500/tor.png",
+    "Utah Jazz":            "https://a.espncdn.com/i/teamlogos/nba/500/utah.png",
+    "Washington Wizards":   "https://a.espncdn.com/i/teamlogos/nba/500/wsh.png",
+}
+
+
+# ── League registry ───────────────────────────────────────────────────────────
+# Everything that differs per league lives here: the gamma tag used for market
+# discovery, where social signals are scraped, and the team alias / badge maps.
+LEAGUES = {
+    "prem": {
+        "tag_id":    82,
+        "title":     "Premier League Markets",
+        "logo":      "https://upload.wikimedia.org/wikipedia/en/f/f2/Premier_League_Logo.svg",
+        "subreddit": "Soccer",
+        "geo":       "GB",
+        "anchor":    "Premier League",   # Trends anchor keyword, see trendData
+        "aliases":   ALIAS_TABLES["prem"],    # data/aliases/prem.json
+        "trends_terms": TRENDS_TERMS.get("prem", {}),
+        "badges":    CLUB_BADGES,
+    },
+    "nba": {
+        "tag_id":    745,
+        "title":     "NBA Markets",
+        "logo":      "https://a.espncdn.com/i/teamlogos/leagues/500/nba.png",
+        "subreddit": "nba",
+        "geo":       "US",
+        "anchor":    "NBA",
+        "aliases":   ALIAS_TABLES["nba"],     # data/aliases/nba.json
+        "trends_terms": TRENDS_TERMS.get("nba", {}),   # data/trends_terms/nba.json
+        "badges":    NBA_BADGES,
+    },
+}
+
+DEFAULT_LEAGUE = "prem"
+
+ALL_BADGES = {}
+for _cfg in LEAGUES.values():
+    ALL_BADGES.update(_cfg["badges"])
+
+BADGE_MATCHER = AliasMatcher(ALL_BADGES)
+
+
+def get_league(key):
+    """Registry entry for `key`, falling back to the default league."""
+    return LEAGUES.get(key, LEAGUES[DEFAULT_LEAGUE])
@@ -1,5 +1,14 @@
+import threading
+import time
 import streamlit as st
-import requests
+from concurrent.futures import ThreadPoolExecutor, wait
+import comovement
+import marketdata
+import pricestore
+import ratiostore
+import refresher
+from equations import risk_score
+from leagues import BADGE_MATCHER, get_league
 
 st.set_page_config(
     page_title="Polymarket Event Risk Manager",
@@ -187,7 +196,7 @@ div[data-testid="stDecoration"] { display: none; }
 
 .card-stats {
     display: grid;
-    grid-template-columns: repeat(3, 1fr);
+    grid-template-columns: repeat(4, 1fr);
     gap: 8px;
     border-top: 1px solid rgba(255,255,255,0.06);
     padding-top: 14px;
@@ -247,108 +256,30 @@ div[data-testid="stDecoration"] { display: none; }
 """, unsafe_allow_html=True)
 
 
-# ── Club badge map (ESPN CDN, no API key needed) ───────────────────────────────
-CLUB_BADGES = {
-    "Arsenal":              "https://a.espncdn.com/i/teamlogos/soccer/500/359.png",
-    "Aston Villa":          "https://a.espncdn.com/i/teamlogos/soccer/500/362.png",
-    "Bournemouth":          "https://a.espncdn.com/i/teamlogos/soccer/500/349.png",
-    "Brentford":            "https://a.espncdn.com/i/teamlogos/soccer/500/337.png",
-    "Brighton":             "https://a.espncdn.com/i/teamlogos/soccer/500/331.png",
-    "Chelsea":              "https://a.espncdn.com/i/teamlogos/soccer/500/363.png",
-    "Crystal Palace":       "https://a.espncdn.com/i/teamlogos/soccer/500/384.png",
-    "Everton":              "https://a.espncdn.com/i/teamlogos/soccer/500/368.png",
-    "Fulham":               "https://a.espncdn.com/i/teamlogos/soccer/500/370.png",
-    "Ipswich Town":         "https://a.espncdn.com/i/teamlogos/soccer/500/QuoteIPSWICH.png",
-    "Ipswich":              "https://a.espncdn.com/i/teamlogos/soccer/500/QuoteIPSWICH.png",
-    "Leicester City":       "https://a.espncdn.com/i/teamlogos/soccer/500/375.png",
-    "Leicester":            "https://a.espncdn.com/i/teamlogos/soccer/500/375.png",
-    "Liverpool":            "https://a.espncdn.com/i/teamlogos/soccer/500/364.png",
-    "Manchester City":      "https://a.espncdn.com/i/teamlogos/soccer/500/382.png",
-    "Man City":             "https://a.espncdn.com/i/teamlogos/soccer/500/382.png",
-    "Manchester United":    "https://a.espncdn.com/i/teamlogos/soccer/500/360.png",
-    "Man United":           "https://a.espncdn.com/i/teamlogos/soccer/500/360.png",
-    "Newcastle United":     "https://a.espncdn.com/i/teamlogos/soccer/500/361.png",
-    "Newcastle":            "https://a.espncdn.com/i/teamlogos/soccer/500/361.png",
-    "Nottingham Forest":    "https://a.espncdn.com/i/teamlogos/soccer/500/393.png",
-    "Southampton":          "https://a.espncdn.com/i/teamlogos/soccer/500/376.png",
-    "Tottenham Hotspur":    "https://a.espncdn.com/i/teamlogos/soccer/500/367.png",
-    "Tottenham":            "https://a.espncdn.com/i/teamlogos/soccer/500/367.png",
-    "Spurs":                "https://a.espncdn.com/i/teamlogos/soccer/500/367.png",
-    "West Ham United":      "https://a.espncdn.com/i/teamlogos/soccer/500/371.png",
-    "West Ham":             "https://a.espncdn.com/i/teamlogos/soccer/500/371.png",
-    "Wolverhampton":        "https://a.espncdn.com/i/teamlogos/soccer/500/380.png",
-    "Wolves":               "https://a.espncdn.com/i/teamlogos/soccer/500/380.png",
-}
-
-NBA_BADGES = {
-    "Atlanta Hawks":        "https://a.espncdn.com/i/teamlogos/nba/500/atl.png",
-    "Boston Celtics":       "https://a.espncdn.com/i/teamlogos/nba/500/bos.png",
-    "Brooklyn Nets":        "https://a.espncdn.com/i/teamlogos/nba/500/bkn.png",
-    "Charlotte Hornets":    "https://a.espncdn.com/i/teamlogos/nba/500/cha.png",
-    "Chicago Bulls":        "https://a.espncdn.com/i/teamlogos/nba/500/chi.png",
-    "Cleveland Cavaliers":  "https://a.espncdn.com/i/teamlogos/nba/500/cle.png",
-    "Dallas Mavericks":     "https://a.espncdn.com/i/teamlogos/nba/500/dal.png",
-    "Denver Nuggets":       "https://a.espncdn.com/i/teamlogos/nba/500/den.png",
-    "Detroit Pistons":      "https://a.espncdn.com/i/teamlogos/nba/500/det.png",
-    "Golden State Warriors":"https://a.espncdn.com/i/teamlogos/nba/500/gs.png",
-    "Houston Rockets":      "https://a.espncdn.com/i/teamlogos/nba/500/hou.png",
-    "Indiana Pacers":       "https://a.espncdn.com/i/teamlogos/nba/500/ind.png",
-    "LA Clippers":          "https://a.espncdn.com/i/teamlogos/nba/500/lac.png",
-    "Los Angeles Clippers": "https://a.espncdn.com/i/teamlogos/nba/500/lac.png",
-    "LA Lakers":            "https://a.espncdn.com/i/teamlogos/nba/500/lal.png",
-    "Los Angeles Lakers":   "https://a.espncdn.com/i/teamlogos/nba/500/lal.png",
-    "Memphis Grizzlies":    "https://a.espncdn.com/i/teamlogos/nba/500/mem.png",
-    "Miami Heat":           "https://a.espncdn.com/i/teamlogos/nba/500/mia.png",
-    "Milwaukee Bucks":      "https://a.espncdn.com/i/teamlogos/nba/500/mil.png",
-    "Minnesota Timberwolves":"https://a.espncdn.com/i/teamlogos/nba/500/min.png",
-    "New Orleans Pelicans": "https://a.espncdn.com/i/teamlogos/nba/500/no.png",
-    "New York Knicks":      "https://a.espncdn.com/i/teamlogos/nba/500/ny.png",
-    "Oklahoma City Thunder":"https://a.espncdn.com/i/teamlogos/nba/500/okc.png",
-    "Orlando Magic":        "https://a.espncdn.com/i/teamlogos/nba/500/orl.png",
-    "Philadelphia 76ers":   "https://a.espncdn.com/i/teamlogos/nba/500/phi.png",
-    "Phoenix Suns":         "https://a.espncdn.com/i/teamlogos/nba/500/phx.png",
-    "Portland Trail Blazers":"https://a.espncdn.com/i/teamlogos/nba/500/por.png",
-    "Sacramento Kings":     "https://a.espncdn.com/i/teamlogos/nba/500/sac.png",
-    "San Antonio Spurs":    "https://a.espncdn.com/i/teamlogos/nba/500/sa.png",
-    "Toronto Raptors":      "https://a.espncdn.com/i/teamlogos/nba/500/tor.png",
-    "Utah Jazz":            "https://a.espncdn.com/i/teamlogos/nba/500/utah.png",
-    "Washington Wizards":   "https://a.espncdn.com/i/teamlogos/nba/500/wsh.png",
-}
-
-ALL_BADGES = {**CLUB_BADGES, **NBA_BADGES}
-
+# ── Club badges (see leagues.py) ──────────────────────────────────────────────
 def get_badge_url(question: str):
-    """Return the first matching team badge URL found in the question, or None."""
-    q = question.lower()
-    for team in sorted(ALL_BADGES.keys(), key=len, reverse=True):
-        if team.lower() in q:
-            return ALL_BADGES[team]
-    return None
+    """Return the badge URL of the longest team name found in the question, or None."""
+    return BADGE_MATCHER.longest(question)
 
 
 # ── Data ──────────────────────────────────────────────────────────────────────
+# Pages read from the background refresher's store; the cached direct fetches
+# below only serve requests that arrive before its first cycle completes.
+@st.cache_resource
+def get_refresher():
+    worker = refresher.Refresher()
+    worker.start()
+    return worker
+
+
 @st.cache_data(ttl=120)
-def fetch_markets(tag_id: int = 82):
-    BASE = "https://gamma-api.polymarket.com"
-    params = {"tag_id": tag_id, "active": "true", "closed": "false",
-              "order": "volume", "ascending": "false", "limit": 50}
-    events = requests.get(f"{BASE}/events", params=params).json()
-    markets = []
-    for event in events:
-        for market in event.get("markets", []):
-            markets.append({
-                "id":                 market.get("id"),
-                "conditionId":        market.get("conditionId"),   # needed by whalescore trades API
-                "question":           market.get("question", ""),
-                "volume":             float(market.get("volume")     or 0),
-                "volume24hr":         float(market.get("volume24hr") or 0),
-                "liquidity":          float(market.get("liquidity")  or 0),
-                "startDate":          event.get("startDate", ""),   # needed by speculation ratio
-                "bestBid":            market.get("bestBid"),
-                "bestAsk":            market.get("bestAsk"),
-                "endDate":            market.get("endDate"),
-            })
-    return sorted(markets, key=lambda m: m["volume"], reverse=True)[:50]
+def _fetch_markets(league: str):
+    return marketdata.load_markets(league, max_markets=marketdata.LISTED)
+
+
+def fetch_markets(league: str = "prem"):
+    markets = get_refresher().store.markets(league)
+    return markets if markets is not None else _fetch_markets(league)
 
 def fmt(n):
     if n >= 1_000_000: return f"${n/1_000_000:.1f}M"
@@ -366,6 +297,15 @@ def fmt_ratio(r):
     except (TypeError, ValueError):
         return "—"
 
+def fmt_risk(r):
+    if r is None:
+        return "—"
+    try:
+        v = float(r)
+        return f"{v:.2f}" if v < 10 else f"{v:.1f}"
+    except (TypeError, ValueError):
+        return "—"
+
 
 # ── Session state ─────────────────────────────────────────────────────────────
 if "screen" not in st.session_state:
@@ -421,34 +361,14 @@ def menu():
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-LEAGUE_CONFIG = {
-    "prem": {
-        "tag_id": 82,
-        "title": "Premier League Markets",
-        "logo": "https://upload.wikimedia.org/wikipedia/en/f/f2/Premier_League_Logo.svg",
-    },
-    "nba": {
-        "tag_id": 745,
-        "title": "NBA Markets",
-        "logo": "https://a.espncdn.com/i/teamlogos/leagues/500/nba.png",
-    },
-}
-
-def load_ratios():
-    """Read average speculation_ratio and whale_ratio from ratios.txt."""
-    try:
-        with open("ratios.txt", "r") as f:
-            lines = [l.strip() for l in f.readlines() if l.strip()]
-        spec  = float(lines[0]) if len(lines) > 0 else None
-        whale = float(lines[1]) if len(lines) > 1 else None
-        return spec, whale
-    except Exception:
-        return 25, 25
+def load_ratios(league: str = "prem"):
+    """Average speculation_ratio and whale_ratio for a league, see ratiostore.averages."""
+    return ratiostore.averages(league)
 
 
 def prem():
     league = st.session_state.get("league", "prem")
-    cfg    = LEAGUE_CONFIG.get(league, LEAGUE_CONFIG["prem"])
+    cfg    = get_league(league)
 
     st.markdown(
         '<div class="league-header">' +
@@ -459,7 +379,7 @@ def prem():
     )
 
     # ── Ratios banner ─────────────────────────────────────────────────────────
-    avg_spec, avg_whale = load_ratios()
+    avg_spec, avg_whale = load_ratios(league)
 
     def _ratio_tile(label, value, fmt_fn):
         val_str = fmt_fn(value) if value is not None else "—"
@@ -496,9 +416,27 @@ def prem():
             st.rerun()
     st.markdown('</div>', unsafe_allow_html=True)
 
-    markets = fetch_markets(cfg["tag_id"])
+    markets = fetch_markets(league)
+    store   = get_refresher().store
+    risks   = {m["conditionId"]: store.risk(m["conditionId"]) for m in markets}
+
     st.markdown('<div style="padding: 20px 40px;">', unsafe_allow_html=True)
 
+    # Risk scores are precomputed for every listed market by the refresher
+    sort_by = st.radio("Sort by", ["Volume", "Risk Score"], horizontal=True,
+                       key="sort_by", label_visibility="collapsed")
+    if sort_by == "Risk Score":
+        markets = sorted(markets, key=lambda m: (risks.get(m["conditionId"]) is None,
+                                                 -(risks.get(m["conditionId"]) or 0)))
+
+    # Markets whose prices moved together over the last few hours
+    groups = comovement.correlated_groups([m["id"] for m in markets])
+    if groups:
+        questions = {str(m["id"]): m["question"] for m in markets}
+        with st.expander(f"Clustered exposure — {len(groups)} group(s) of co-moving markets"):
+            for group in groups:
+                st.markdown("- " + "  \n  ".join(questions[i] for i in group))
+
     cols_per_row = 2
     rows = [markets[i:i+cols_per_row] for i in range(0, len(markets), cols_per_row)]
 
@@ -518,6 +456,7 @@ def prem():
                     '<div class="stat-item"><div class="stat-value">' + fmt(m["volume"])     + '</div><div class="stat-label">Volume</div></div>'
                     '<div class="stat-item"><div class="stat-value">' + fmt(m["volume24hr"]) + '</div><div class="stat-label">24h</div></div>'
                     '<div class="stat-item"><div class="stat-value">' + fmt(m["liquidity"])  + '</div><div class="stat-label">Liquidity</div></div>'
+                    '<div class="stat-item"><div class="stat-value">' + fmt_risk(risks.get(m["conditionId"])) + '</div><div class="stat-label">Risk</div></div>'
                     '</div>'
                     '</div>'
                 )
@@ -531,22 +470,148 @@ def prem():
 
     st.markdown('</div>', unsafe_allow_html=True)
 # ══════════════════════════════════════════════════════════════════════════════
-@st.cache_data(ttl=60)
-def fetch_market_detail(market_id: str):
-    BASE = "https://gamma-api.polymarket.com"
-    CLOB = "https://clob.polymarket.com"
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_market(market_id: str):
+    return marketdata.load_market(market_id)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_price_history(market_id: str):
+    return marketdata.load_price_history(market_id)
+
+
+# ── Ratio caches ──────────────────────────────────────────────────────────────
+# Fallback for markets the refresher has not scored yet. The counters live in
+# st.cache_resource so they survive reruns and show up in the debug panel.
+@st.cache_resource
+def cache_stats():
+    return {name: {"calls": 0, "misses": 0} for name in ("whale", "speculation")}
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _whale(condition_id: str):
+    cache_stats()["whale"]["misses"] += 1
     try:
-        m = requests.get(f"{BASE}/markets/{market_id}", timeout=5).json()
-    except Exception:
-        m = {}
+        from whalescore import single_whale_ratio
+        return single_whale_ratio(condition_id)
+    except Exception as e:
+        return ("error", str(e))
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _speculation(condition_id: str, question: str, start_date: str, league: str, _volume: float):
+    # _volume is not part of the cache key: a ratio stays cached for the TTL
+    # even as the market's volume ticks.
+    cache_stats()["speculation"]["misses"] += 1
     try:
-        hist = requests.get(f"{CLOB}/prices-history",
-                            params={"market": market_id, "interval": "1d", "fidelity": 30},
-                            timeout=5).json()
-        prices = hist.get("history", [])
-    except Exception:
-        prices = []
-    return m, prices
+        from bet import Bet
+        from speculation import find_single_speculation_ratio
+        return find_single_speculation_ratio(Bet(condition_id, question, _volume, start_date, league=league))
+    except Exception as e:
+        return ("error", str(e))
+
+
+def whale_ratio(condition_id: str):
+    cache_stats()["whale"]["calls"] += 1
+    return _whale(condition_id)
+
+
+def speculation_ratio(condition_id: str, question: str, start_date: str, league: str, volume: float):
+    cache_stats()["speculation"]["calls"] += 1
+    return _speculation(condition_id, question, start_date, league, volume)
+
+
+def debug_panel():
+    """Cache hit/miss counters and refresher state; shown with ?debug=1 in the URL."""
+    with st.expander("Debug: caches"):
+        for name, c in cache_stats().items():
+            hits = c["calls"] - c["misses"]
+            rate = f"{hits / c['calls']:.0%}" if c["calls"] else "—"
+            st.text(f"{name:<12} calls {c['calls']:>5}   hits {hits:>5}   misses {c['misses']:>5}   hit rate {rate}")
+        for name, ts in get_refresher().store.updated.items():
+            st.text(f"refresher {name:<8} updated {time.time() - ts:.0f}s ago")
+
+
+# ── Single bet fan-out ────────────────────────────────────────────────────────
+PAGE_DEADLINE = 6  # seconds the detail page waits for upstream data in total
+
+
+@st.cache_resource
+def _fanout_pool():
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix="fanout")
+
+
+@st.cache_resource
+def _in_flight():
+    """(source, id) -> Future still owed to a page. st.cache_data doesn't share calls in progress."""
+    return {"lock": threading.Lock(), "futures": {}}
+
+
+def _submit_once(name, key, task):
+    """Reuse the running Future for (name, key) if a previous rerun started one."""
+    flight = _in_flight()
+    with flight["lock"]:
+        future = flight["futures"].get((name, key))
+        if future is not None:
+            return future
+        future = _fanout_pool().submit(*task)
+        flight["futures"][(name, key)] = future
+    # outside the lock: the callback runs right here if the task already finished
+    future.add_done_callback(lambda f: _forget(name, key, f))
+    return future
+
+
+def _forget(name, key, future):
+    flight = _in_flight()
+    with flight["lock"]:
+        if flight["futures"].get((name, key)) is future:
+            del flight["futures"][(name, key)]
+
+
+def load_single_bet(m):
+    """
+    Market detail, price history and both ratios for one market.
+
+    Anything the refresher already holds is read from its store; the rest is
+    fetched concurrently under one shared PAGE_DEADLINE. Returns
+    (detail, prices, whale, speculation, pending), where `pending` names the
+    sources that missed the deadline. They keep running and land in the
+    st.cache_data caches; a rerun before they finish waits on the same
+    Future instead of starting another fetch.
+    """
+    store        = get_refresher().store
+    market_id    = str(m["id"])
+    condition_id = m.get("conditionId") or ""
+    results      = {"detail": {}, "prices": pricestore.series(market_id), "whale": None, "speculation": None}
+
+    cached_detail = store.detail(market_id)
+    if cached_detail is not None:
+        results["detail"], results["prices"] = cached_detail
+    cached_ratios = store.ratios(condition_id)
+    if cached_ratios is not None:
+        results["whale"], results["speculation"] = cached_ratios
+
+    tasks = {}
+    if cached_detail is None:
+        tasks["detail"] = (market_id, (_fetch_market, market_id))
+        tasks["prices"] = (market_id, (_fetch_price_history, market_id))
+    if cached_ratios is None:
+        tasks["whale"]       = (condition_id, (whale_ratio, condition_id))
+        tasks["speculation"] = (condition_id, (speculation_ratio, condition_id, m.get("question", ""),
+                                               m.get("startDate", ""), m.get("league", "prem"),
+                                               float(m.get("volume", 0) or 0)))
+
+    futures = {name: _submit_once(name, key, task) for name, (key, task) in tasks.items()}
+    done, _ = wait(futures.values(), timeout=PAGE_DEADLINE)
+
+    pending = []
+    for name, future in futures.items():
+        if future in done:
+            results[name] = future.result()
+        else:
+            pending.append(name)
+
+    return results["detail"], results["prices"], results["whale"], results["speculation"], pending
 
 
 def single_bet():
@@ -568,7 +633,10 @@ def single_bet():
     volume24hr = float(m.get("volume24hr", 0) or 0)
     liquidity  = float(m.get("liquidity",  0) or 0)
 
-    detail, price_history = fetch_market_detail(str(m["id"]))
+    with st.spinner("Loading market…"):
+        detail, price_history, whale_raw, spec_raw, pending = load_single_bet(m)
+    if pending:
+        st.caption("Still loading: " + ", ".join(pending) + " — rerun to update.")
 
     import json as _json
     from datetime import datetime, timezone
@@ -595,37 +663,6 @@ def single_bet():
         except: pass
 
     # ── Whale Ratio & Speculation Ratio ───────────────────────────────────────
-    @st.cache_data(ttl=300, show_spinner=False)
-    def _whale(condition_id: str):
-        try:
-            from whalescore import single_whale_ratio
-            return single_whale_ratio(condition_id)
-        except Exception as e:
-            return ("error", str(e))
-
-    @st.cache_data(ttl=300, show_spinner=False)
-    def _speculation(condition_id: str, question: str, volume: float, start_date: str):
-        try:
-            from speculation import find_single_speculation_ratio
-
-            class _Bet:
-                pass
-            bet = _Bet()
-            bet.id        = condition_id
-            bet.question  = question
-            bet.volume    = volume
-            bet.startDate = start_date
-            return find_single_speculation_ratio(bet)
-        except Exception as e:
-            return ("error", str(e))
-
-    condition_id = m.get("conditionId") or ""
-    start_date   = m.get("startDate", "")
-
-    with st.spinner("Computing ratios…"):
-        whale_raw = _whale(condition_id)
-        spec_raw  = _speculation(condition_id, question, volume, start_date)
-
     # Surface errors visibly so you know what's failing
     if isinstance(whale_raw, tuple) and whale_raw[0] == "error":
         st.warning(f"Whale ratio error: {whale_raw[1]}")
@@ -635,18 +672,13 @@ def single_bet():
         spec_raw = None
 
     # ── Risk Score ────────────────────────────────────────────────────────────
-    # Composite of both metrics normalised against their respective market averages:
-    #   risk_score = (equations.calc_whale_metric(avg_whale, this_whale)
-    #                 + equations.calc_whale_metric(avg_spec, this_spec)) / 2
-    avg_spec, avg_whale = load_ratios()
+    # Composite of both metrics normalised against their respective market averages,
+    # see equations.risk_score.
+    avg_spec, avg_whale = load_ratios(m.get("league", "prem"))
 
     risk_score_raw = None
     try:
-        from equations import calc_whale_metric
-        if whale_raw is not None and spec_raw is not None and avg_whale is not None and avg_spec is not None:
-            whale_component = calc_whale_metric(avg_whale, float(whale_raw))
-            spec_component  = calc_whale_metric(avg_spec,  float(spec_raw))
-            risk_score_raw  = 1- (whale_component + spec_component ) /2
+        risk_score_raw = risk_score(whale_raw, spec_raw, avg_whale, avg_spec)
     except Exception as e:
         st.warning(f"Risk score error: {e}")
 
@@ -658,15 +690,6 @@ def single_bet():
         except (TypeError, ValueError):
             return "—"
 
-    def fmt_risk(r):
-        if r is None:
-            return "—"
-        try:
-            v = float(r)
-            return f"{v:.2f}" if v < 10 else f"{v:.1f}"
-        except (TypeError, ValueError):
-            return "—"
-
     whale_ratio_str       = fmt_whale(whale_raw)
     speculation_ratio_str = fmt_ratio(spec_raw)
     risk_score_str        = fmt_risk(risk_score_raw)
@@ -778,15 +801,11 @@ def single_bet():
     )
 
     # Price history chart
-    if price_history:
+    times, prices = price_history
+    if len(times):
         import pandas as pd
         import altair as alt
-        df = pd.DataFrame(price_history)
-        if len(df.columns) == 2:
-            df.columns = ["time", "price"]
-        df["time"]  = pd.to_datetime(df["time"], unit="s", errors="coerce")
-        df["price"] = pd.to_numeric(df["price"], errors="coerce") * 100
-        df = df.dropna()
+        df = pd.DataFrame({"time": pd.to_datetime(times, unit="s"), "price": prices * 100})
         if not df.empty:
             chart = (
                 alt.Chart(df)
@@ -818,4 +837,7 @@ if screen == "menu":
 elif screen == "prem":
     prem()
 elif screen == "single_bet":
-    single_bet()
\ No newline at end of file
+    single_bet()
+
+if st.query_params.get("debug"):
+    debug_panel()
\ No newline at end of file
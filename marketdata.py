@@ -0,0 +1,114 @@
+import threading
+from cachetools import TTLCache
+
+import discovery
+import http_client
+import pricestore
+
+BASE = "https://gamma-api.polymarket.com"
+CLOB = "https://clob.polymarket.com"
+
+LISTED       = 50    # markets shown per league
+DETAIL_TTL   = 300   # seconds a gamma market dict is served from memory
+DETAIL_BATCH = 50    # ids per multi-id /markets request
+
+# Full gamma market dicts by id. Discovery pages already carry them, so every
+# list fetch fills this cache and opening a market rarely needs a request of its own.
+_details      = TTLCache(maxsize=4096, ttl=DETAIL_TTL)
+_details_lock = threading.Lock()
+
+# ── Market list / detail fetchers ─────────────────────────────────────────────
+# Plain functions (no Streamlit) so both the app and the background refresher
+# can call them.
+
+
+def _remember_details(page):
+    with _details_lock:
+        for market in page:
+            if market.get("id") is not None:
+                _details[str(market["id"])] = market
+
+
+def load_market_table(leagues, max_markets=discovery.MAX_MARKETS):
+    """
+    discovery.MarketTable of every active market in `leagues`. Full market
+    dicts are kept in the detail cache as the pages stream past.
+    """
+    return discovery.discover_markets(leagues, max_markets, on_page=_remember_details)
+
+
+def listed_markets(table, leagues):
+    """{league: top LISTED markets by volume} from a market table."""
+    return {league: table.top(LISTED, league=league) for league in leagues}
+
+
+def load_markets(league="prem", max_markets=LISTED):
+    """Listed markets for one league. Pages come highest volume first, so LISTED rows suffice."""
+    return load_all_markets([league], max_markets)[league]
+
+
+def load_all_markets(leagues, max_markets=discovery.MAX_MARKETS):
+    """{league: markets} for several leagues, discovered concurrently."""
+    return listed_markets(load_market_table(leagues, max_markets), leagues)
+
+
+def load_market_details(market_ids):
+    """
+    {market id: gamma market dict} for many markets. Ids missing from the
+    cache are fetched DETAIL_BATCH at a time with multi-id /markets queries;
+    ids that still fail map to {}.
+    """
+    ids = list(dict.fromkeys(str(i) for i in market_ids))
+    with _details_lock:
+        found = {i: _details[i] for i in ids if i in _details}
+    missing = [i for i in ids if i not in found]
+
+    for start in range(0, len(missing), DETAIL_BATCH):
+        batch = missing[start:start + DETAIL_BATCH]
+        try:
+            markets = http_client.get_json(f"{BASE}/markets",
+                                           params=[("id", i) for i in batch] + [("limit", len(batch))],
+                                           timeout=5)
+        except Exception as e:
+            print(f"  Market detail error for {len(batch)} ids: {e}")
+            continue
+        with _details_lock:
+            for market in markets:
+                _details[str(market.get("id"))] = market
+                found[str(market.get("id"))] = market
+
+    return {i: found.get(i, {}) for i in ids}
+
+
+def load_market(market_id: str):
+    """Gamma market dict, or {} on failure."""
+    return load_market_details([market_id])[str(market_id)]
+
+
+def _price_points(market_id, start_ts=None):
+    """CLOB history points: the full 1d window, or only those from `start_ts` on."""
+    params = {"market": market_id, "fidelity": 30}
+    if start_ts is None:
+        params["interval"] = "1d"
+    else:
+        params["startTs"] = start_ts
+    hist = http_client.get_json(f"{CLOB}/prices-history", params=params, timeout=5)
+    return hist.get("history", [])
+
+
+def load_price_history(market_id: str):
+    """
+    (timestamps, prices) arrays for one market, downsampled for the chart.
+    Only points newer than the ones already held are fetched; on failure the
+    last known series is returned.
+    """
+    try:
+        pricestore.sync(market_id, lambda start_ts: _price_points(market_id, start_ts))
+    except Exception as e:
+        print(f"  Price history error for {market_id}: {e}")
+    return pricestore.series(market_id)
+
+
+def load_market_detail(market_id: str):
+    """(gamma market dict, CLOB price history) for one market; either is empty on failure."""
+    return load_market(market_id), load_price_history(market_id)
@@ -0,0 +1,55 @@
+import re
+
+# ── Compiled alias matcher ────────────────────────────────────────────────────
+# All keys are folded into one trie-shaped regex, e.g. "Man City", "Man United"
+# and "Manchester City" become  Man(?:\ City|\ United|chester\ City). Sibling
+# branches start with different characters, so the engine never retries
+# alternatives at a position and a scan is linear in the text length. Optional
+# tails are greedy, which gives leftmost-longest matches: "Manchester City"
+# wins over "Man City", and "Man City" never matches inside "Man United".
+
+
+def _trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class AliasMatcher:
+    """Case-insensitive, whole-word lookup of any key of `mapping` inside a string."""
+
+    def __init__(self, mapping):
+        self._values = {k.lower(): v for k, v in mapping.items()}
+        pattern = _trie_pattern(self._values) if self._values else r"(?!)"
+        self._regex = re.compile(r"(?<!\w)(" + pattern + r")(?!\w)", re.IGNORECASE)
+
+    def __contains__(self, key):
+        return key.lower() in self._values
+
+    def get(self, key, default=None):
+        """Exact (case-insensitive) key lookup."""
+        return self._values.get(key.lower(), default)
+
+    def longest(self, text):
+        """Value for the longest key found anywhere in `text` (leftmost on ties), or None."""
+        best = None
+        for m in self._regex.finditer(text):
+            if best is None or len(m.group(1)) > len(best):
+                best = m.group(1)
+        return self._values[best.lower()] if best else None
+
+    def find_all(self, text):
+        """Values of every non-overlapping match, in order of appearance."""
+        return [self._values[m.group(1).lower()] for m in self._regex.finditer(text)]
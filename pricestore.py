@@ -0,0 +1,107 @@
+import threading
+import time
+import numpy as np
+
+# ── Price history store ───────────────────────────────────────────────────────
+# In-memory CLOB price series per market. The first sync downloads the whole
+# window; later syncs ask only for points after the last timestamp held, so a
+# refresh transfers bytes proportional to the new ticks. Points live in
+# growable numpy columns and are downsampled to the chart's width on read.
+
+WINDOW       = 24 * 3600   # matches the interval=1d series the chart shows
+CHART_POINTS = 240
+
+
+class PriceSeries:
+    """Append-only (timestamp, price) columns with amortised growth."""
+
+    def __init__(self, capacity=256):
+        self._t = np.empty(capacity, dtype=np.int64)
+        self._p = np.empty(capacity, dtype=np.float64)
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def last_ts(self):
+        return int(self._t[self._n - 1]) if self._n else None
+
+    def append(self, points):
+        """Add {"t", "p"} points newer than the last one held; returns how many were added."""
+        last = self.last_ts
+        rows = [(int(pt["t"]), float(pt["p"])) for pt in points
+                if pt.get("t") is not None and pt.get("p") is not None]
+        rows = sorted(r for r in rows if last is None or r[0] > last)
+        if not rows:
+            return 0
+        need = self._n + len(rows)
+        if need > len(self._t):
+            size = max(need, 2 * len(self._t))
+            self._t = np.resize(self._t, size)
+            self._p = np.resize(self._p, size)
+        t, p = zip(*rows)
+        self._t[self._n:need] = t
+        self._p[self._n:need] = p
+        self._n = need
+        return len(rows)
+
+    def trim(self, cutoff):
+        """Drop points older than `cutoff`."""
+        start = int(np.searchsorted(self._t[:self._n], cutoff))
+        if start:
+            keep = self._n - start
+            self._t[:keep] = self._t[start:self._n]
+            self._p[:keep] = self._p[start:self._n]
+            self._n = keep
+
+    def view(self):
+        return self._t[:self._n].copy(), self._p[:self._n].copy()
+
+
+def downsample(t, p, max_points=CHART_POINTS):
+    """Last point in each of `max_points` equal time buckets; short series (or None) pass through."""
+    if max_points is None or len(t) <= max_points:
+        return t, p
+    edges = np.linspace(t[0], t[-1], max_points + 1)[1:]
+    idx = np.unique(np.searchsorted(t, edges, side="right") - 1)
+    return t[idx], p[idx]
+
+
+_series = {}
+_locks  = {}
+_locks_lock = threading.Lock()
+
+
+def _lock(market_id):
+    with _locks_lock:
+        return _locks.setdefault(market_id, threading.Lock())
+
+
+def sync(market_id, fetch):
+    """
+    Bring `market_id` up to date. `fetch(start_ts)` returns CLOB history
+    points; start_ts is None on the first sync and last_ts + 1 afterwards.
+    Returns the number of new points.
+    """
+    market_id = str(market_id)
+    with _lock(market_id):
+        series = _series.get(market_id)
+        if series is None:
+            series = PriceSeries()
+        start_ts = series.last_ts + 1 if series.last_ts is not None else None
+        added = series.append(fetch(start_ts))
+        series.trim(int(time.time()) - WINDOW)
+        _series[market_id] = series
+        return added
+
+
+def series(market_id, max_points=CHART_POINTS):
+    """(timestamps, prices) arrays for `market_id`, downsampled to `max_points`."""
+    market_id = str(market_id)
+    with _lock(market_id):
+        held = _series.get(market_id)
+        if held is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        t, p = held.view()
+    return downsample(t, p, max_points)
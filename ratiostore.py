@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+import time
+
+# ── Ratio snapshot store ──────────────────────────────────────────────────────
+# Each batch run (`python speculation.py`) writes one snapshot per league: the
+# aggregate averages with sample counts, plus every market's own ratios.
+# Readers keep the latest snapshots in memory until the file's mtime changes.
+
+RATIO_DB     = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ratios.db")
+LEGACY_TXT   = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ratios.txt")
+DEFAULT_AVGS = (25, 25)
+
+_cache      = {"mtime": None, "latest": {}}
+_cache_lock = threading.Lock()
+
+
+def _connect():
+    os.makedirs(os.path.dirname(RATIO_DB), exist_ok=True)
+    conn = sqlite3.connect(RATIO_DB, timeout=30)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            league          TEXT    NOT NULL,
+            created_at      REAL    NOT NULL,
+            avg_speculation REAL,
+            avg_whale       REAL,
+            n_speculation   INTEGER NOT NULL,
+            n_whale         INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS market_ratios (
+            run_id            INTEGER NOT NULL REFERENCES runs(run_id),
+            condition_id      TEXT    NOT NULL,
+            question          TEXT,
+            whale_ratio       REAL,
+            speculation_ratio REAL,
+            PRIMARY KEY (run_id, condition_id)
+        );
+        CREATE INDEX IF NOT EXISTS runs_league ON runs (league, created_at);
+    """)
+    return conn
+
+
+def write_snapshot(league, bets, avg_speculation, avg_whale):
+    """Record one run for `league`. Sample counts are the bets with a non-zero ratio."""
+    n_spec  = sum(1 for b in bets if b.speculation_ratio)
+    n_whale = sum(1 for b in bets if b.whale_ratio)
+
+    conn = _connect()
+    try:
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO runs (league, created_at, avg_speculation, avg_whale, n_speculation, n_whale) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (league, time.time(), avg_speculation, avg_whale, n_spec, n_whale),
+            )
+            run_id = cur.lastrowid
+            conn.executemany(
+                "INSERT OR REPLACE INTO market_ratios VALUES (?, ?, ?, ?, ?)",
+                [(run_id, b.id, b.question, b.whale_ratio, b.speculation_ratio) for b in bets],
+            )
+    finally:
+        conn.close()
+    return run_id
+
+
+def _read_latest():
+    conn = _connect()
+    try:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute("""
+            SELECT r.* FROM runs r
+            JOIN (SELECT league, MAX(run_id) AS run_id FROM runs GROUP BY league) m
+              ON r.run_id = m.run_id
+        """).fetchall()
+        return {row["league"]: dict(row) for row in rows}
+    finally:
+        conn.close()
+
+
+def latest(league):
+    """Most recent snapshot row for `league` as a dict, or None. Cached until the db changes."""
+    try:
+        mtime = os.path.getmtime(RATIO_DB)
+    except OSError:
+        return None
+
+    with _cache_lock:
+        if _cache["mtime"] != mtime:
+            _cache["latest"] = _read_latest()
+            _cache["mtime"]  = mtime
+        return _cache["latest"].get(league)
+
+
+def averages(league):
+    """
+    (avg_speculation, avg_whale) for a league: the latest snapshot, then the
+    legacy ratios.txt, then DEFAULT_AVGS.
+    """
+    snap = latest(league)
+    if snap is not None:
+        return snap["avg_speculation"], snap["avg_whale"]
+    try:
+        with open(LEGACY_TXT, "r") as f:
+            lines = [l.strip() for l in f.readlines() if l.strip()]
+        spec  = float(lines[0]) if len(lines) > 0 else None
+        whale = float(lines[1]) if len(lines) > 1 else None
+        return spec, whale
+    except Exception:
+        return DEFAULT_AVGS
+
+
+def history(league, limit=30):
+    """Past snapshot rows for `league`, newest first."""
+    conn = _connect()
+    try:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            "SELECT * FROM runs WHERE league = ? ORDER BY run_id DESC LIMIT ?", (league, limit)
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def market_ratios(run_id):
+    """{condition_id: (whale_ratio, speculation_ratio)} for one run."""
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT condition_id, whale_ratio, speculation_ratio FROM market_ratios WHERE run_id = ?",
+            (run_id,),
+        ).fetchall()
+        return {cid: (w, s) for cid, w, s in rows}
+    finally:
+        conn.close()
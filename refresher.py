@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import marketdata
+import risk
+from leagues import LEAGUES
+
+# ── Background refresher ──────────────────────────────────────────────────────
+# Daemon threads that keep market lists, market details, per-market ratios
+# and risk scores fresh in a shared in-memory store, so page renders only read
+# precomputed results. Lists and details refresh on one thread; ratios run on
+# their own, scoring the listed markets every cycle and the rest of the
+# discovered long tail TAIL_BATCH markets at a time, so a slow ratio pass never
+# holds up the lists. main.py starts one per server via st.cache_resource.
+
+MARKETS_INTERVAL = 120   # seconds between market list + detail refreshes
+RATIOS_INTERVAL  = 300   # seconds between whale / speculation refreshes
+DETAIL_WORKERS   = 8
+TAIL_BATCH       = 100   # long-tail markets scored per ratios cycle
+
+
+class SharedStore:
+    """Thread-safe latest-value store written by the refresher, read by pages."""
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._markets = {}   # league -> [market dict]
+        self._details = {}   # market id -> (detail, price history)
+        self._ratios  = {}   # condition id -> (whale ratio, speculation ratio)
+        self._risk    = {}   # condition id -> risk score
+        self.updated  = {}   # "markets" / "ratios" -> unix time of last refresh
+
+    def markets(self, league):
+        with self._lock:
+            return self._markets.get(league)
+
+    def detail(self, market_id):
+        with self._lock:
+            return self._details.get(str(market_id))
+
+    def ratios(self, condition_id):
+        with self._lock:
+            return self._ratios.get(condition_id)
+
+    def risk(self, condition_id):
+        with self._lock:
+            return self._risk.get(condition_id)
+
+    def put_markets(self, by_league, details):
+        with self._lock:
+            self._markets.update(by_league)
+            self._details.update(details)
+            self.updated["markets"] = time.time()
+
+    def put_ratios(self, ratios, risk_scores):
+        with self._lock:
+            self._ratios.update(ratios)
+            self._risk.update(risk_scores)
+            self.updated["ratios"] = time.time()
+
+
+class Refresher(threading.Thread):
+    """
+    Refreshes every registered league on a fixed schedule until stopped.
+    start() also launches the ratios worker, which follows its own schedule.
+    """
+
+    def __init__(self, store=None, leagues=None,
+                 markets_interval=MARKETS_INTERVAL, ratios_interval=RATIOS_INTERVAL,
+                 tail_batch=TAIL_BATCH):
+        super().__init__(name="refresher", daemon=True)
+        self.store            = store or SharedStore()
+        self.leagues          = list(leagues or LEAGUES)
+        self.markets_interval = markets_interval
+        self.ratios_interval  = ratios_interval
+        self.tail_batch       = tail_batch
+        self._stop_event      = threading.Event()
+        self._table           = None    # latest discovery.MarketTable
+        self._table_ready     = threading.Event()
+        self._tail_cursor     = 0
+        self._ratios_thread   = threading.Thread(target=self._run_ratios, name="refresher-ratios", daemon=True)
+
+    def start(self):
+        super().start()
+        self._ratios_thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def refresh_markets(self):
+        table     = marketdata.load_market_table(self.leagues)
+        by_league = marketdata.listed_markets(table, self.leagues)
+        ids = [str(m["id"]) for markets in by_league.values() for m in markets]
+        markets = marketdata.load_market_details(ids)   # already cached by discovery
+        with ThreadPoolExecutor(max_workers=DETAIL_WORKERS) as pool:
+            prices = dict(zip(ids, pool.map(marketdata.load_price_history, ids)))
+        self.store.put_markets(by_league, {i: (markets[i], prices[i]) for i in ids})
+        self._table = table
+        self._table_ready.set()
+        return table
+
+    def refresh_ratios(self, table):
+        """Score the listed markets, then the next TAIL_BATCH slice of the long tail."""
+        listed = [m for league in self.leagues for m in (self.store.markets(league) or [])]
+        self.store.put_ratios(*risk.compute_risk(listed))
+
+        listed_ids = {m["conditionId"] for m in listed}
+        tail = [m for m in table.records() if m["conditionId"] not in listed_ids]
+        if tail:
+            start = self._tail_cursor if self._tail_cursor < len(tail) else 0
+            batch = tail[start:start + self.tail_batch]
+            self._tail_cursor = start + len(batch)
+            self.store.put_ratios(*risk.compute_risk(batch))
+
+    def run(self):
+        while not self._stop_event.is_set():
+            started = time.time()
+            try:
+                self.refresh_markets()
+            except Exception as e:
+                print(f"  Refresher error: {e}")
+            self._stop_event.wait(max(0.0, self.markets_interval - (time.time() - started)))
+
+    def _run_ratios(self):
+        while not self._table_ready.wait(1.0):
+            if self._stop_event.is_set():
+                return
+        while not self._stop_event.is_set():
+            started = time.time()
+            try:
+                self.refresh_ratios(self._table)
+            except Exception as e:
+                print(f"  Ratio refresher error: {e}")
+            self._stop_event.wait(max(0.0, self.ratios_interval - (time.time() - started)))
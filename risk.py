@@ -0,0 +1,49 @@
+import ratiostore
+from bet import Bet
+from equations import risk_score
+
+# ── Batch risk scoring ────────────────────────────────────────────────────────
+# Scores every listed market in one pass so the grid can show and sort by risk
+# without anyone opening the market first. Ratios are computed concurrently
+# through speculation.compute_market_ratios.
+
+
+def score_markets(markets, ratios):
+    """
+    {condition_id: risk score} for `markets` given precomputed
+    `ratios` {condition_id: (whale, speculation)}; None where unscorable,
+    including markets whose whale or speculation fetch failed (None ratio).
+    """
+    averages = {}
+    scores = {}
+    for m in markets:
+        cid = m.get("conditionId")
+        if not cid or cid not in ratios:
+            continue
+        league = m.get("league", "prem")
+        if league not in averages:
+            averages[league] = ratiostore.averages(league)
+        avg_spec, avg_whale = averages[league]
+        whale, spec = ratios[cid]
+        try:
+            scores[cid] = risk_score(whale, spec, avg_whale, avg_spec)
+        except (TypeError, ValueError, ArithmeticError):
+            scores[cid] = None   # one bad market must not sink the whole batch
+    return scores
+
+
+def compute_risk(markets):
+    """
+    Ratios and risk scores for every market dict in `markets`, fetched concurrently.
+
+    Returns ({condition_id: (whale, speculation)}, {condition_id: risk}).
+    """
+    from speculation import compute_market_ratios
+
+    bets = [
+        Bet(m["conditionId"], m["question"], m["volume"], m["startDate"], league=m.get("league", "prem"))
+        for m in markets if m.get("conditionId")
+    ]
+    bets = compute_market_ratios(bets)
+    ratios = {b.id: (b.whale_ratio, b.speculation_ratio) for b in bets}
+    return ratios, score_markets(markets, ratios)
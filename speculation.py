@@ -1,18 +1,20 @@
 import datetime as dt
-from speculator import scrape_posts
+from bet import materialize_analytics
+import teamsignals
 from extractor import extract_teams
-from trendData import scrape_trends
+from leagues import DEFAULT_LEAGUE
 
 
 def find_single_speculation_ratio(bet):
-    teams = extract_teams(bet.question)
+    league = getattr(bet, "league", None) or DEFAULT_LEAGUE
+    teams = extract_teams(bet.question, league)
 
     if not teams:
         return 0
-    
+
     start_date = bet.startDate[:10]
-    reddit_matches = scrape_posts("Soccer", teams[0], start_date)
-    google_trends = scrape_trends(teams[0], start_date)
+    reddit_matches = teamsignals.reddit_count(teams[0], league, start_date)
+    google_trends = teamsignals.trend_score(teams[0], league, start_date)
 
     social_buzz = (reddit_matches + 1) * (google_trends + 1)
 
@@ -21,13 +23,14 @@ def find_single_speculation_ratio(bet):
     return ratio
 
 def find_average_speculation_ratio(bets):
+    """Mean speculation ratio over `bets`, reusing each Bet's memoized value."""
     total_ratio = 0
     count = 0
 
     for bet in bets:
-        ratio = find_single_speculation_ratio(bet)
+        ratio = bet.speculation_ratio
 
-        if ratio == 0:
+        if not ratio:
             continue
 
         total_ratio += ratio
@@ -39,16 +42,47 @@ def find_average_speculation_ratio(bets):
     return total_ratio / count
 
 
+def compute_market_ratios(bets):
+    """
+    Whale and speculation ratios for one batch run, each market computed once.
+
+    Bets sharing a conditionId are collapsed onto a single Bet for the run,
+    so repeated markets never trigger a second fetch, and social signals are
+    prefetched once per distinct team. Returns the de-duplicated bets with
+    their analytics filled in.
+    """
+    memo = {}
+    for bet in bets:
+        memo.setdefault(bet.id, bet)
+    unique = list(memo.values())
+
+    teams_by_league = {}
+    for bet in unique:
+        teams = extract_teams(bet.question, bet.league)
+        if teams:
+            teams_by_league.setdefault(bet.league, []).append(teams[0])
+    for league, teams in teams_by_league.items():
+        teamsignals.prefetch(teams, league)
+
+    materialize_analytics(unique)
+    return unique
+
+
 # ── Only runs when you execute this file directly, not on import ──────────────
 if __name__ == "__main__":
-    from top50Markets import FindTop50Markets
+    import marketdata
+    from top50Markets import bets_from_markets
     from whalescore import average_whale_ratio
-
-    bets = FindTop50Markets()
-    average_speculation_ratio = find_average_speculation_ratio(bets)
-    whale_ratio = average_whale_ratio(bets)
-
-    with open("ratios.txt", "w") as f:
-        f.write(f"{average_speculation_ratio}\n")
-        f.write(f"{whale_ratio}\n")
-    print(f"Average Speculation Ratio: {average_speculation_ratio:.4f}")
+    from leagues import LEAGUES
+    from ratiostore import write_snapshot
+
+    # Same population the grid lists and risk.score_markets normalises
+    leagues = list(LEAGUES)
+    table   = marketdata.load_market_table(leagues, max_markets=marketdata.LISTED)
+    for league, markets in marketdata.listed_markets(table, leagues).items():
+        bets = compute_market_ratios(bets_from_markets(markets))
+        average_speculation_ratio = find_average_speculation_ratio(bets)
+        whale_ratio = average_whale_ratio(bets)
+
+        write_snapshot(league, bets, average_speculation_ratio, whale_ratio)
+        print(f"[{league}] Average Speculation Ratio: {average_speculation_ratio:.4f}")
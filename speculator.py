@@ -1,39 +1,144 @@
+import os
+import sqlite3
+import threading
 import time
-import requests
+import http_client
 from datetime import datetime, timezone
-from top50Markets import FindTop50Markets
 
 BASE_URL= "https://arctic-shift.photon-reddit.com"
-SUBREDDIT = "Soccer"        
+SUBREDDIT = "Soccer"
 
-session =  requests.Session()
+# ── Daily post-count index ────────────────────────────────────────────────────
+# Per (subreddit, keyword) we keep only post counts per UTC day plus the exact
+# created_utc of the newest post seen, so a call fetches just the posts after
+# that cursor and never holds post bodies in memory.
 
-def scrape_posts(subreddit: str, keyword: str, start_date: str) -> list[dict]:
-    all_posts = []
-    after = start_date
+REDDIT_DB    = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "reddit.db")
+PAGE_SIZE    = 50
+MIN_RESYNC   = 15 * 60  # seconds; within this a pair is served from the index alone
+
+_pair_locks = {}
+_pair_locks_lock = threading.Lock()
+
+
+def _pair_lock(subreddit, keyword):
+    with _pair_locks_lock:
+        return _pair_locks.setdefault((subreddit, keyword), threading.Lock())
+
+
+def _connect():
+    os.makedirs(os.path.dirname(REDDIT_DB), exist_ok=True)
+    conn = sqlite3.connect(REDDIT_DB, timeout=30)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS daily_counts (
+            subreddit TEXT    NOT NULL,
+            keyword   TEXT    NOT NULL,
+            day       TEXT    NOT NULL,
+            count     INTEGER NOT NULL,
+            PRIMARY KEY (subreddit, keyword, day)
+        );
+        CREATE TABLE IF NOT EXISTS sync_state (
+            subreddit   TEXT NOT NULL,
+            keyword     TEXT NOT NULL,
+            synced_from TEXT NOT NULL,   -- first day covered by daily_counts
+            last_utc    REAL,            -- created_utc of the newest post counted
+            synced_at   REAL NOT NULL,
+            PRIMARY KEY (subreddit, keyword)
+        );
+    """)
+    return conn
+
+
+def _day(utc):
+    return datetime.fromtimestamp(utc, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _count_since(subreddit, keyword, after):
+    """Page through posts after `after`; returns ({day: count}, newest created_utc)."""
+    counts = {}
+    last_utc = None
 
     while True:
         params = {
             "subreddit": subreddit,
             "title":     keyword,
             "after":     after,
-            "limit":     50,
+            "limit":     PAGE_SIZE,
             "sort":      "asc",
+            "fields":    "created_utc",
         }
 
-        response = session.get(f"{BASE_URL}/api/posts/search", params=params, timeout=30)
-        if response.status_code == 429:
-            time.sleep(3)
-            continue
-        response.raise_for_status()
+        response = http_client.get_json(f"{BASE_URL}/api/posts/search", params=params, timeout=30)
+
+        batch = response.get("data", [])
+        for post in batch:
+            day = _day(post["created_utc"])
+            counts[day] = counts.get(day, 0) + 1
 
-        batch = response.json().get("data", [])
-        all_posts.extend(batch)
+        if batch:
+            last_utc = batch[-1]["created_utc"]
 
-        if len(batch) < 50:  
+        if len(batch) < PAGE_SIZE:
             break
 
-        last_utc = batch[-1]["created_utc"]
-        after = datetime.fromtimestamp(last_utc, tz=timezone.utc).strftime("%Y-%m-%d")
+        # exact cursor: a day-truncated one re-reads the same day's posts
+        after = int(last_utc)
+
+    return counts, last_utc
+
+
+def sync_counts(subreddit, keyword, start_date):
+    """Bring the daily index for (subreddit, keyword) up to date from `start_date`."""
+    with _pair_lock(subreddit, keyword):
+        conn = _connect()
+        try:
+            state = conn.execute(
+                "SELECT synced_from, last_utc, synced_at FROM sync_state WHERE subreddit = ? AND keyword = ?",
+                (subreddit, keyword),
+            ).fetchone()
+
+            if state and state[0] <= start_date:
+                synced_from, last_utc, synced_at = state
+                if time.time() - synced_at < MIN_RESYNC:
+                    return
+                after = int(last_utc) if last_utc is not None else synced_from
+            else:
+                # first sync, or the window now starts earlier than what we hold
+                synced_from, last_utc, after = start_date, None, start_date
+                with conn:
+                    conn.execute("DELETE FROM daily_counts WHERE subreddit = ? AND keyword = ?",
+                                 (subreddit, keyword))
+
+            counts, newest = _count_since(subreddit, keyword, after)
+
+            with conn:
+                conn.executemany(
+                    "INSERT INTO daily_counts VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(subreddit, keyword, day) DO UPDATE SET count = count + excluded.count",
+                    [(subreddit, keyword, day, n) for day, n in counts.items()],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?, ?)",
+                    (subreddit, keyword, synced_from, newest if newest is not None else last_utc, time.time()),
+                )
+        finally:
+            conn.close()
+
+
+def daily_counts(subreddit, keyword, start_date):
+    """{day: post count} from the index for days on or after `start_date`."""
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            "SELECT day, count FROM daily_counts WHERE subreddit = ? AND keyword = ? AND day >= ? ORDER BY day",
+            (subreddit, keyword, start_date),
+        ).fetchall()
+        return dict(rows)
+    finally:
+        conn.close()
+
 
-    return len(all_posts)    
\ No newline at end of file
+def scrape_posts(subreddit: str, keyword: str, start_date: str) -> int:
+    """Number of `subreddit` posts with `keyword` in the title since `start_date`."""
+    sync_counts(subreddit, keyword, start_date)
+    return sum(daily_counts(subreddit, keyword, start_date).values())
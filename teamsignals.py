@@ -0,0 +1,107 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import speculator
+import trendData
+from leagues import get_league
+
+# ── Team-level social signals ─────────────────────────────────────────────────
+# Reddit counts and Trends series are fetched once per canonical team over a
+# shared LOOKBACK_DAYS window; each market's own window is then sliced out of
+# those cached signals. Scraping cost scales with distinct teams, not markets.
+# Markets that started before the window are scored on the window alone.
+# Reddit is searched by canonical name (what post titles use); Trends by the
+# league's trends_terms keyword where one exists, e.g. "Miami Heat" for "Heat".
+
+LOOKBACK_DAYS = 180   # Trends keeps daily resolution up to ~270 days
+MAX_WORKERS   = 4
+
+_team_locks = {}
+_team_locks_lock = threading.Lock()
+
+
+def _team_lock(team, league):
+    with _team_locks_lock:
+        return _team_locks.setdefault((team, league), threading.Lock())
+
+
+def window_start():
+    return (date.today() - timedelta(days=LOOKBACK_DAYS)).isoformat()
+
+
+def _start(start_date):
+    """
+    `start_date` as YYYY-MM-DD, clamped to the shared window: window_start()
+    when it is earlier, empty or unparseable.
+    """
+    try:
+        return max(date.fromisoformat((start_date or "")[:10]).isoformat(), window_start())
+    except ValueError:
+        return window_start()
+
+
+def _timeframe():
+    return f"{window_start()} {date.today().isoformat()}"
+
+
+def trends_term(team, league):
+    """The Google Trends keyword for canonical `team`."""
+    return get_league(league).get("trends_terms", {}).get(team, team)
+
+
+def trends_series(team, league):
+    """Cached [(date, value), ...] for `team` over the shared window."""
+    cfg  = get_league(league)
+    term = trends_term(team, league)
+    with _team_lock(team, league):
+        return trendData.interest_series([term], _timeframe(), cfg["geo"], cfg["anchor"])[term]
+
+
+def trend_score(team, league, start_date):
+    """trendData.trend_score over the part of the team's series on or after `start_date`."""
+    start_date = _start(start_date)
+    try:
+        points = trends_series(team, league)
+    except Exception as e:
+        print(f"  Trends error for '{team}': {e}")
+        return 0.0
+    return trendData.trend_score([p for p in points if p[0][:10] >= start_date])
+
+
+def reddit_count(team, league, start_date):
+    """Posts mentioning `team` in the league's subreddit since `start_date` (clamped to the window)."""
+    subreddit  = get_league(league)["subreddit"]
+    start_date = _start(start_date)   # same window as trend_score; never widens the shared index
+    with _team_lock(team, league):
+        speculator.sync_counts(subreddit, team, window_start())
+    return sum(speculator.daily_counts(subreddit, team, start_date).values())
+
+
+def prefetch(teams, league):
+    """
+    Warm both signals for many teams at once: Trends misses are batched five
+    keywords per payload, Reddit syncs run concurrently.
+    """
+    teams = list(dict.fromkeys(t for t in teams if t))
+    if not teams:
+        return
+    cfg = get_league(league)
+    subreddit = cfg["subreddit"]
+    sync_from = window_start()
+
+    def _reddit(team):
+        try:
+            with _team_lock(team, league):
+                speculator.sync_counts(subreddit, team, sync_from)
+        except Exception as e:
+            print(f"  Reddit error for '{team}': {e}")
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        reddit = pool.map(_reddit, teams)   # runs while Trends is fetched below
+        try:
+            terms = list(dict.fromkeys(trends_term(t, league) for t in teams))
+            trendData.interest_series(terms, _timeframe(), cfg["geo"], cfg["anchor"])
+        except Exception as e:
+            print(f"  Trends error for {teams}: {e}")
+        list(reddit)
@@ -1,74 +1,27 @@
 from bet import Bet
-import requests
+import marketdata
+from leagues import DEFAULT_LEAGUE
 
-BASE = "https://gamma-api.polymarket.com"
+# ── Top markets as Bets ───────────────────────────────────────────────────────
+# Thin wrappers over marketdata's /markets discovery, so the batch job scores
+# exactly the markets the grid lists and the refresher scores.
 
-params = {
-    "tag_id": 82,
-    "active": "true",
-    "closed": "false",
-    "order": "volume",
-    "ascending": "false",
-    "limit": 50,
-}
 
-paramsNBA = {
-    "tag_id": 745,
-    "active": "true",
-    "closed": "false",
-    "order": "volume",
-    "ascending": "false",
-    "limit": 50,
-}
+def bets_from_markets(markets):
+    """Bets for the app's market dicts; markets without a conditionId are skipped."""
+    return [
+        Bet(m["conditionId"], m["question"], m["volume"], m["startDate"], league=m["league"])
+        for m in markets if m.get("conditionId")
+    ]
 
-events = requests.get(f"{BASE}/events", params=params).json()
 
-eventsNBA =requests.get(f"{BASE}/events", params=paramsNBA).json()
- 
+def FindTopMarkets(league=DEFAULT_LEAGUE, max_markets=marketdata.LISTED):
+    return bets_from_markets(marketdata.load_markets(league, max_markets))
 
-def FindTop50Markets():
-    bets = []
-
-    for event in events:
-        # 1. Grab the array of markets inside the event container
-        markets = event.get("markets", [])
-        
-        market = markets[0] if markets else None
-
-        condition_id = market.get("conditionId")
-        
-        if not condition_id:
-            continue
 
-        question = market.get("question", event.get("title")) 
-        volume = market.get("volume", 0)
-        startDate = event.get("startDate")
-
-        bet = Bet(condition_id, question, volume, startDate)
-        bets.append(bet)
-        
-    return bets
+def FindTop50Markets():
+    return FindTopMarkets("prem")
 
 
 def FindTop50MarketsNBA():
-    bets = []
-
-    for event in eventsNBA:
-        # 1. Grab the array of markets inside the event container
-        markets = event.get("markets", [])
-        
-        market = markets[0] if markets else None
-
-        condition_id = market.get("conditionId")
-        
-        if not condition_id:
-            continue
-
-        question = market.get("question", event.get("title")) 
-        volume = market.get("volume", 0)
-        startDate = event.get("startDate")
-
-        bet = Bet(condition_id, question, volume, startDate)
-        bets.append(bet)
-        
-    return bets
\ No newline at end of file
+    return FindTopMarkets("nba")
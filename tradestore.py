@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import threading
+import numpy as np
+from datetime import datetime, timedelta
+
+# ── Local trade store ─────────────────────────────────────────────────────────
+# SQLite cache of data-api trades, keyed by market and trade timestamp.
+# After the first sync only trades newer than the last one seen are fetched,
+# and anything older than the 4-week whale window is evicted. /trades pages
+# newest first by offset, so a walk cut short by the request cap records where
+# it stopped (backfill_offset) and the top of that walk (head_ts); later syncs
+# catch up above head_ts and resume the backfill from the shifted offset.
+
+TRADE_DB  = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "trades.db")
+WINDOW    = timedelta(weeks=4)
+
+_TRADE_COLUMNS = "market, timestamp, tx, wallet, asset, side, size"
+
+_local = threading.local()
+
+
+def _conn():
+    """One connection per thread; batch_whale_ratios syncs from a thread pool."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(TRADE_DB), exist_ok=True)
+        conn = sqlite3.connect(TRADE_DB, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        trade_columns = {row[1] for row in conn.execute("PRAGMA table_info(trades)")}
+        migrate = bool(trade_columns) and "seq" not in trade_columns
+        if migrate:
+            conn.execute("ALTER TABLE trades RENAME TO trades_old")
+        # seq never goes backwards (AUTOINCREMENT), unlike the implicit rowid,
+        # which SQLite reuses once the highest rows are evicted
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS trades (
+                seq       INTEGER PRIMARY KEY AUTOINCREMENT,
+                market    TEXT    NOT NULL,
+                timestamp INTEGER NOT NULL,
+                tx        TEXT    NOT NULL,
+                wallet    TEXT    NOT NULL,
+                asset     TEXT    NOT NULL,
+                side      TEXT    NOT NULL,
+                size      REAL    NOT NULL,
+                UNIQUE (market, timestamp, tx, wallet, asset, side)
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                market          TEXT PRIMARY KEY,
+                last_ts         INTEGER NOT NULL,
+                head_ts         INTEGER,
+                backfill_offset INTEGER
+            );
+        """)
+        if migrate:
+            with conn:
+                conn.execute(f"INSERT OR IGNORE INTO trades ({_TRADE_COLUMNS}) "
+                             f"SELECT {_TRADE_COLUMNS} FROM trades_old ORDER BY timestamp")
+                conn.execute("DROP TABLE trades_old")
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sync_state)")}
+        for column in ("head_ts", "backfill_offset"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE sync_state ADD COLUMN {column} INTEGER")
+        _local.conn = conn
+    return conn
+
+
+def _cutoff():
+    return int((datetime.now() - WINDOW).timestamp())
+
+
+def _row(market, t):
+    return (
+        market,
+        int(t.get("timestamp", 0)),
+        t.get("transactionHash") or "",
+        t.get("proxyWallet"),
+        t.get("asset") or "",
+        t.get("side") or "",
+        float(t.get("size", 0) or 0),
+    )
+
+
+def _state(market):
+    row = _conn().execute(
+        "SELECT last_ts, head_ts, backfill_offset FROM sync_state WHERE market = ?", (market,)
+    ).fetchone()
+    return row if row else (0, None, None)
+
+
+def _walk(conn, market, fetch_page, offset, stop_ts, max_pages, page_size):
+    """
+    Page down from `offset`, storing trades at or after `stop_ts`.
+
+    Returns (next offset, reached stop_ts, newest timestamp, trades newer
+    than stop_ts, pages used, rows inserted).
+    """
+    newest, newer, inserted = None, 0, 0
+    for pages in range(1, max_pages + 1):
+        batch = fetch_page(market, page_size, offset)
+        offset += page_size
+        kept = [t for t in batch if t.get("timestamp", 0) >= stop_ts]
+        rows = [_row(market, t) for t in kept if t.get("proxyWallet") is not None]
+        if rows:
+            newest = max(newest or 0, max(r[1] for r in rows))
+            newer += sum(1 for r in rows if r[1] > stop_ts)
+            with conn:
+                before = conn.total_changes
+                conn.executemany(f"INSERT OR IGNORE INTO trades ({_TRADE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                inserted += conn.total_changes - before
+        if len(batch) < page_size or len(kept) < len(batch):
+            return offset, True, newest, newer, pages, inserted
+    return offset, False, newest, newer, max_pages, inserted
+
+
+def sync(market, fetch_page, page_size, max_pages):
+    """
+    Pull trades for `market` into the store and evict expired ones.
+
+    `fetch_page(market, limit, offset)` returns one page of trades, newest
+    first. At most `max_pages` requests are made; last_ts only advances once
+    a walk reaches the previous last_ts (or the 4-week cutoff), otherwise the
+    walk's position is kept so the next sync continues the backfill. Returns
+    the number of rows inserted.
+    """
+    cutoff = _cutoff()
+    last, head, backfill = _state(market)
+    if head is not None and head < cutoff:
+        head = backfill = None   # the unfinished gap has expired anyway
+    stop = max(last, cutoff)
+    conn = _conn()
+
+    inserted, offset, budget = 0, 0, max_pages
+    if head is not None:
+        # Trades newer than the unfinished walk's top have shifted its offsets
+        end, reached, newest, newer, used, n = _walk(conn, market, fetch_page, 0, head, budget, page_size)
+        inserted += n
+        budget   -= used
+        if reached:
+            head, offset = max(head, newest or 0), backfill + newer
+        else:
+            # Still catching up; continuing from here also covers the old gap
+            head, backfill, budget = newest or head, end, 0
+
+    if budget:
+        end, reached, newest, _, _, n = _walk(conn, market, fetch_page, offset, stop, budget, page_size)
+        inserted += n
+        top = head if head is not None else newest
+        if reached:
+            last, head, backfill = max(last, top or 0), None, None
+        else:
+            head, backfill = top, end
+    elif head is not None and offset:
+        backfill = offset
+
+    with conn:
+        conn.execute(
+            "INSERT INTO sync_state (market, last_ts, head_ts, backfill_offset) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(market) DO UPDATE SET last_ts = excluded.last_ts, "
+            "head_ts = excluded.head_ts, backfill_offset = excluded.backfill_offset",
+            (market, last, head, backfill),
+        )
+        conn.execute("DELETE FROM trades WHERE market = ? AND timestamp < ?", (market, cutoff))
+    return inserted
+
+
+def columns(market):
+    """
+    (wallets, sizes, timestamps) arrays of every stored trade for `market`.
+    The window cutoff is left to the caller; sync already evicts older rows.
+    """
+    rows = _conn().execute(
+        "SELECT wallet, size, timestamp FROM trades WHERE market = ?", (market,)
+    ).fetchall()
+    if not rows:
+        return np.empty(0, dtype=object), np.empty(0), np.empty(0, dtype=np.int64)
+    wallets, sizes, timestamps = zip(*rows)
+    return (
+        np.array(wallets, dtype=object),
+        np.array(sizes, dtype=float),
+        np.array(timestamps, dtype=np.int64),
+    )
+
+
+def rows_since(market, seq):
+    """
+    (last seq, [(wallet, size, timestamp), ...]) for trades of `market`
+    inserted after `seq`, in insertion order. Lets a streaming consumer
+    pick up exactly what each sync added, backfilled trades included.
+    """
+    rows = _conn().execute(
+        "SELECT seq, wallet, size, timestamp FROM trades WHERE market = ? AND seq > ? ORDER BY seq",
+        (market, seq),
+    ).fetchall()
+    return (rows[-1][0] if rows else seq), [r[1:] for r in rows]
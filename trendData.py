@@ -1,34 +1,160 @@
-import pytrends
+import json
+import os
+import sqlite3
+import threading
 from pytrends.request import TrendReq
+from pytrends.exceptions import TooManyRequestsError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 import time
 
-pytrends = TrendReq(hl='en-GB', tz=0)
+# ── Trends service ────────────────────────────────────────────────────────────
+# Interest series are cached on disk per (keyword, timeframe, geo, anchor) for a day.
+# Misses are fetched up to BATCH_SIZE keywords per payload, with an anchor
+# keyword in every payload so values from different batches share one scale.
 
+TRENDS_DB    = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "trends.db")
+CACHE_TTL    = 24 * 3600  # seconds
+BATCH_SIZE   = 5          # pytrends accepts at most 5 keywords per payload
+ANCHOR_LEVEL = 100.0      # anchor mean after normalisation
+MIN_INTERVAL = 1.0        # seconds between payloads, Trends rate-limits hard
 
-def scrape_trends(keyword: str, start_date: str):
-    try:
-        pytrends.build_payload(
-            kw_list   = [keyword],
-            timeframe = f"{start_date} {time.strftime('%Y-%m-%d')}",
-            geo       = "GB",          # UK-focused since Premier League
+_client      = None
+_client_lock = threading.Lock()   # TrendReq holds per-payload state, one caller at a time
+_last_call   = 0.0
+
+
+def _pytrends():
+    """TrendReq fetches a Google cookie on construction, so build it on first use."""
+    global _client
+    if _client is None:
+        _client = TrendReq(hl='en-GB', tz=0)
+    return _client
+
+
+def _connect():
+    os.makedirs(os.path.dirname(TRENDS_DB), exist_ok=True)
+    conn = sqlite3.connect(TRENDS_DB, timeout=30)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(series)")}
+    if columns and "anchor" not in columns:
+        conn.execute("DROP TABLE series")   # pre-anchor cache; rows can't be told apart
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS series (
+            keyword    TEXT NOT NULL,
+            timeframe  TEXT NOT NULL,
+            geo        TEXT NOT NULL,
+            anchor     TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            points     TEXT NOT NULL,
+            PRIMARY KEY (keyword, timeframe, geo, anchor)
         )
+    """)
+    return conn
+
+
+def _cached(keywords, timeframe, geo, anchor):
+    conn = _connect()
+    try:
+        fresh_after = time.time() - CACHE_TTL
+        found = {}
+        for kw in keywords:
+            row = conn.execute(
+                "SELECT points FROM series "
+                "WHERE keyword = ? AND timeframe = ? AND geo = ? AND anchor = ? AND fetched_at >= ?",
+                (kw, timeframe, geo, anchor or "", fresh_after),
+            ).fetchone()
+            if row:
+                found[kw] = [tuple(p) for p in json.loads(row[0])]
+        return found
+    finally:
+        conn.close()
+
+
+def _store(series, timeframe, geo, anchor):
+    conn = _connect()
+    try:
+        with conn:
+            now = time.time()
+            conn.executemany(
+                "INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?, ?)",
+                [(kw, timeframe, geo, anchor or "", now, json.dumps(points)) for kw, points in series.items()],
+            )
+    finally:
+        conn.close()
+
 
-        interest    = pytrends.interest_over_time()
-        related     = pytrends.related_queries()
+@retry(
+    retry=retry_if_exception_type(TooManyRequestsError),
+    wait=wait_random_exponential(multiplier=2, max=60),
+    stop=stop_after_attempt(4),
+    reraise=True,
+)
+def _interest_over_time(kw_list, timeframe, geo):
+    global _last_call
+    with _client_lock:
+        wait = MIN_INTERVAL - (time.time() - _last_call)
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            pytrends = _pytrends()
+            pytrends.build_payload(kw_list=kw_list, timeframe=timeframe, geo=geo)
+            return pytrends.interest_over_time()
+        finally:
+            _last_call = time.time()
 
-        if interest.empty:
-            return 0.0
 
-        scores = interest[keyword].tolist()
+def _fetch_batch(keywords, timeframe, geo, anchor):
+    kw_list  = list(keywords) + ([anchor] if anchor and anchor not in keywords else [])
+    interest = _interest_over_time(kw_list, timeframe, geo)
 
-        values = {
-            "peak":    max(scores),
-            "mean":    round(sum(scores) / len(scores), 2),
-            "current": scores[-1],                              # most recent value
-            "related": related[keyword]["top"]["query"].tolist()[:5] if related[keyword]["top"] is not None else []
-        }
+    if interest.empty:
+        return {kw: [] for kw in keywords}
 
-        return values["current"] / values["mean"]
+    scale = 1.0
+    if anchor:
+        anchor_mean = float(interest[anchor].mean())
+        if anchor_mean:
+            scale = ANCHOR_LEVEL / anchor_mean
+
+    dates = [d.strftime("%Y-%m-%d %H:%M") for d in interest.index]
+    return {
+        kw: [(d, float(v) * scale) for d, v in zip(dates, interest[kw].tolist())]
+        for kw in keywords
+    }
+
+
+def interest_series(keywords, timeframe, geo="GB", anchor=None):
+    """
+    {keyword: [(date, value), ...]} for `timeframe`, served from the disk
+    cache where fresh. Values are scaled so `anchor` averages ANCHOR_LEVEL
+    in every payload; without an anchor they are raw Trends values.
+    """
+    keywords = list(dict.fromkeys(keywords))
+    found    = _cached(keywords, timeframe, geo, anchor)
+    missing  = [kw for kw in keywords if kw not in found]
+
+    per_batch = BATCH_SIZE - (1 if anchor else 0)
+    for i in range(0, len(missing), per_batch):
+        fetched = _fetch_batch(missing[i:i + per_batch], timeframe, geo, anchor)
+        _store(fetched, timeframe, geo, anchor)
+        found.update(fetched)
+
+    return {kw: found.get(kw, []) for kw in keywords}
+
+
+def trend_score(points):
+    """Most recent interest relative to the mean over the series."""
+    if not points:
+        return 0.0
+    scores = [v for _, v in points]
+    mean = sum(scores) / len(scores)
+    return scores[-1] / mean if mean else 0.0
+
+
+def scrape_trends(keyword: str, start_date: str, geo: str = "GB", anchor: str = None):
+    try:
+        timeframe = f"{start_date} {time.strftime('%Y-%m-%d')}"
+        points = interest_series([keyword], timeframe, geo, anchor)[keyword]
+        return trend_score(points)
 
     except Exception as e:
         print(f"  Trends error for '{keyword}': {e}")
@@ -1,86 +1,151 @@
-import requests
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import http_client
+import tradestore
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from whalestream import WhaleStream
 
 BASE = "https://data-api.polymarket.com"
 
-def median(values):
-    values = sorted(values)
+# ── Batch fetch settings ──────────────────────────────────────────────────────
+MAX_WORKERS = 16   # threads used by batch_whale_ratios
+PAGE_SIZE   = 500  # trades per /trades request
+MAX_PAGES   = 20   # request cap per market per sync; longer walks resume next sync
+
+
+def quantiles(values, ps=(50, 95)):
+    """
+    Several percentiles of `values` from a single np.partition pass.
+
+    Returns {"median": ..., p: ...}. Percentiles use the nearest-rank index
+    round(p / 100 * (n - 1)); the median averages the two middle values
+    when n is even.
+    """
+    values = np.asarray(values, dtype=float)
     n = len(values)
     if n == 0:
-        return 0
+        return {"median": 0, **{p: 0 for p in ps}}
+
     mid = n // 2
-    if n % 2 == 1:
-        return values[mid]
-    else:
-        return (values[mid - 1] + values[mid]) / 2
+    idx = {p: int(round((p / 100) * (n - 1))) for p in ps}
+    kth = sorted({mid, max(mid - 1, 0), *idx.values()})
+    part = np.partition(values, kth)
 
-def percentile(values, p):
-    values = sorted(values)
-    n = len(values)
-    if n == 0:
-        return 0
-    if n == 1:
-        return values[0]
-    
-    index = round((p / 100) * (n - 1))
-    return values[index]
+    med = part[mid] if n % 2 == 1 else (part[mid - 1] + part[mid]) / 2
+    return {"median": float(med), **{p: float(part[i]) for p, i in idx.items()}}
 
 
+def median(values):
+    return quantiles(values, ())["median"]
 
+def percentile(values, p):
+    return quantiles(values, (p,))[p]
 
-def single_whale_ratio(id):
-    four_weeks_ago = datetime.now() - timedelta(weeks=4)
-    cutoff = four_weeks_ago.timestamp()
-
-    r = requests.get(f"{BASE}/trades",params={"market": id, "limit": 1000})
-    r.raise_for_status()
-    trades = r.json()
-    
-    trades_4w = []
-    for t in trades:
-        if t.get("timestamp", 0) >= cutoff:
-            trades_4w.append(t)
-    wallet_totals = {}
-
-    for t in trades_4w:
-        wallet = t.get("proxyWallet")
-        size = t.get("size", 0)
-
-        if wallet is None:
-            continue
 
-        if wallet not in wallet_totals:
-            wallet_totals[wallet] = 0
+def fetch_trades_page(id, limit, offset):
+    """One page of trades for a market, newest first."""
+    return http_client.get_json(f"{BASE}/trades", {"market": id, "limit": limit, "offset": offset}, timeout=30)
+
 
-        wallet_totals[wallet] = wallet_totals[wallet] + float(size)
+def wallet_totals_array(wallets, sizes, timestamps, cutoff):
+    """Vectorised cutoff filter + group-by-wallet sum over columnar trade arrays."""
+    wallets    = np.asarray(wallets)
+    sizes      = np.asarray(sizes, dtype=float)
+    timestamps = np.asarray(timestamps)
 
-    totals_list = list(wallet_totals.values())
+    mask = timestamps >= cutoff
+    if not mask.any():
+        return np.empty(0)
+    _, inverse = np.unique(wallets[mask], return_inverse=True)
+    return np.bincount(inverse, weights=sizes[mask])
 
+
+def ratio_from_totals(totals_list):
+    """p95 / median of per-wallet totals, 0 when there is too little data."""
     if len(totals_list) < 5:
         return 0
 
-    c1 = median(totals_list)         # median
-    c2 = percentile(totals_list, 95) # 95th percentile
+    q  = quantiles(totals_list, (95,))
+    c1 = q["median"]  # median
+    c2 = q[95]        # 95th percentile
 
     if c1 == 0:
         return 0
 
     ratio = c2 / c1
-    return ratio 
+    return ratio
+
 
+def single_whale_ratio(id):
+    """p95 / median of per-wallet traded size over the 4-week window, from the synced trade store."""
+    tradestore.sync(id, fetch_trades_page, PAGE_SIZE, MAX_PAGES)
+    cutoff = (datetime.now() - tradestore.WINDOW).timestamp()
+    return ratio_from_totals(wallet_totals_array(*tradestore.columns(id), cutoff))
+
+
+# Repeated batch scoring folds each sync's new trades into a WhaleStream
+# instead of re-aggregating the whole window every cycle. Only the
+# STREAM_MARKETS most recently scored markets keep a state; long-tail markets
+# scored once per rotation fall out and are re-seeded from the store if they
+# come back.
+STREAM_MARKETS = 256
+STREAM         = WhaleStream(tradestore.WINDOW.total_seconds())
+_stream_seqs   = OrderedDict()   # market -> last tradestore seq folded into STREAM, LRU first
+_stream_lock   = threading.Lock()
+
+
+def streamed_whale_ratio(id):
+    """single_whale_ratio, maintained incrementally across calls."""
+    tradestore.sync(id, fetch_trades_page, PAGE_SIZE, MAX_PAGES)
+    with _stream_lock:
+        last, rows = tradestore.rows_since(id, _stream_seqs.get(id, 0))
+        _stream_seqs[id] = last
+        _stream_seqs.move_to_end(id)
+        STREAM.extend(id, rows, time.time())
+        while len(_stream_seqs) > STREAM_MARKETS:
+            stale, _ = _stream_seqs.popitem(last=False)
+            STREAM.drop(stale)
+    return STREAM.ratio(id)
+
+
+def batch_whale_ratios(condition_ids, max_workers=MAX_WORKERS):
+    """
+    Compute whale ratios for many markets concurrently.
+
+    Returns {condition_id: ratio}. A market whose trades cannot be fetched
+    maps to None, so it is left unscored rather than read as a tiny ratio;
+    0 still means "not enough data".
+    """
+    ids = list(dict.fromkeys(cid for cid in condition_ids if cid))
+    if not ids:
+        return {}
+
+    def _one(cid):
+        try:
+            return streamed_whale_ratio(cid)
+        except Exception as e:
+            print(f"  Whale ratio error for '{cid}': {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ids))) as pool:
+        return dict(zip(ids, pool.map(_one, ids)))
 
-    
 
 def average_whale_ratio(bets):
+    """Mean whale ratio over `bets`, reusing each Bet's memoized value."""
+    from bet import materialize_analytics
+    materialize_analytics(bets, speculation=False)
+
     total_ratio = 0
     count = 0
 
     for bet in bets:
+        _ratio = bet.whale_ratio
 
-        conditionId = bet.id
-        _ratio = single_whale_ratio(conditionId)
-
-        if _ratio == 0:
+        if not _ratio:   # 0 (too little data) or None (fetch failed)
             continue
 
         total_ratio += _ratio
@@ -89,4 +154,4 @@ def average_whale_ratio(bets):
     if count == 0:
         return 0
 
-    return total_ratio / count
\ No newline at end of file
+    return total_ratio / count
@@ -0,0 +1,123 @@
+import heapq
+import threading
+from datetime import timedelta
+from sortedcontainers import SortedList
+
+# ── Streaming whale ratio ─────────────────────────────────────────────────────
+# Keeps per-wallet running totals for each market plus a sorted view of those
+# totals, so the p95 / median ratio can be read without re-scanning the
+# 4-week window. Wallet totals go both up (new trades) and down (expiry), so
+# an exact sorted multiset (SortedList) is used rather than an insert-only
+# sketch: a trade or an expiry is O(log n) in the number of wallets, and so
+# is reading a quantile by rank.
+
+WINDOW = timedelta(weeks=4).total_seconds()
+
+
+class MarketWhaleState:
+    """Running whale statistics for one market."""
+
+    def __init__(self, window=WINDOW):
+        self.window  = window
+        self.totals  = {}   # wallet -> running size
+        self.counts  = {}   # wallet -> live trade count
+        self.sorted  = SortedList()   # all wallet totals, ascending
+        self._expiry = []   # heap of (timestamp, wallet, size)
+
+    def _move(self, wallet, delta, count_delta):
+        old = self.totals.get(wallet)
+        if old is not None:
+            self.sorted.remove(old)
+
+        count = self.counts.get(wallet, 0) + count_delta
+        if count <= 0:
+            self.totals.pop(wallet, None)
+            self.counts.pop(wallet, None)
+            return
+
+        new = (old or 0) + delta
+        self.totals[wallet] = new
+        self.counts[wallet] = count
+        self.sorted.add(new)
+
+    def add(self, trade):
+        """Fold one data-api trade dict into the running totals."""
+        wallet = trade.get("proxyWallet")
+        if wallet is None:
+            return
+        self.add_row(wallet, float(trade.get("size", 0)), trade.get("timestamp", 0))
+
+    def add_row(self, wallet, size, ts):
+        """Fold one (wallet, size, timestamp) trade, e.g. a tradestore row."""
+        self._move(wallet, size, 1)
+        heapq.heappush(self._expiry, (ts, wallet, size))
+
+    def expire(self, now):
+        """Drop trades older than the window, relative to `now` (unix seconds)."""
+        cutoff = now - self.window
+        while self._expiry and self._expiry[0][0] < cutoff:
+            _, wallet, size = heapq.heappop(self._expiry)
+            self._move(wallet, -size, -1)
+
+    def merge(self, other):
+        """Fold another state for the same market (e.g. from another shard) into this one."""
+        for ts, wallet, size in other._expiry:
+            self._move(wallet, size, 1)
+            heapq.heappush(self._expiry, (ts, wallet, size))
+
+    def ratio(self):
+        """Same p95 / median ratio as whalescore.single_whale_ratio, read in O(log n)."""
+        values = self.sorted
+        n = len(values)
+        if n < 5:
+            return 0
+
+        mid = n // 2
+        c1  = values[mid] if n % 2 == 1 else (values[mid - 1] + values[mid]) / 2
+        c2  = values[round(0.95 * (n - 1))]
+
+        if c1 == 0:
+            return 0
+        return c2 / c1
+
+
+class WhaleStream:
+    """Per-market MarketWhaleState registry fed from a live trade feed."""
+
+    def __init__(self, window=WINDOW):
+        self.window  = window
+        self.markets = {}
+        self._lock   = threading.Lock()
+
+    def _state(self, market):
+        if market not in self.markets:
+            self.markets[market] = MarketWhaleState(self.window)
+        return self.markets[market]
+
+    def update(self, market, trade, now=None):
+        with self._lock:
+            state = self._state(market)
+            state.add(trade)
+            state.expire(now if now is not None else trade.get("timestamp", 0))
+
+    def extend(self, market, rows, now):
+        """Fold many (wallet, size, timestamp) rows for `market`, then expire relative to `now`."""
+        with self._lock:
+            state = self._state(market)
+            for wallet, size, ts in rows:
+                state.add_row(wallet, size, ts)
+            state.expire(now)
+
+    def drop(self, market):
+        """Forget `market` entirely, e.g. once it is no longer being scored."""
+        with self._lock:
+            self.markets.pop(market, None)
+
+    def ratio(self, market, now=None):
+        with self._lock:
+            state = self.markets.get(market)
+            if state is None:
+                return 0
+            if now is not None:
+                state.expire(now)
+            return state.ratio()